@@ -0,0 +1,61 @@
+"""
+Démarrage à froid de chaque page : temps jusqu'au premier rendu (premier passage complet
+du script, imports compris) dans un processus neuf, et dépendances lourdes chargées au passage.
+
+Usage : python -m benchmarks.bench_cold_start [--runs 5] [pages/buapp.py ...]
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules dont le chargement au démarrage coûte cher (ou ne devrait pas avoir lieu)
+HEAVY_MODULES = ("openai", "numpy", "pandas", "youtube_transcript_api")
+
+# Exécuté dans un processus neuf : Streamlit est importé à part, seul le rendu est chronométré
+PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "exceptions": [e.value for e in app.exception],
+    "heavy": [name for name in sys.argv[2:] if name in sys.modules],
+}))
+"""
+
+
+def measure(page: str, cache_dir: str) -> dict:
+    env = {**os.environ, "PYTHONPATH": ROOT, "SEO_YOUTUBE_CACHE_DIR": cache_dir}
+    output = subprocess.run([sys.executable, "-c", PROBE, os.path.abspath(page), *HEAVY_MODULES],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("pages", nargs="*", help="pages à mesurer (par défaut : toutes)")
+    parser.add_argument("--runs", type=int, default=5, help="processus neufs par page")
+    args = parser.parse_args()
+    pages = args.pages or [os.path.join(ROOT, "homeyoutube.py")] + sorted(glob.glob(os.path.join(ROOT, "pages", "*.py")))
+
+    print(f"{'page':<30} | {'médiane':>8} | {'max':>8} | modules lourds chargés")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for page in pages:
+            runs = [measure(page, cache_dir) for _ in range(args.runs)]
+            seconds = [run["seconds"] for run in runs]
+            heavy = ", ".join(runs[-1]["heavy"]) or "-"
+            errors = " (exception)" if runs[-1]["exceptions"] else ""
+            print(f"{os.path.relpath(page, ROOT):<30} | {statistics.median(seconds):>7.3f}s | "
+                  f"{max(seconds):>7.3f}s | {heavy}{errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark de bout en bout des trois parcours de l'application contre le serveur local
+(benchmarks.stub_server), sans aucun appel réseau réel :
+
+- video   : 1_video_optimisation (métadonnées, transcription, résumé, génération structurée)
+- keyword : buapp.process_keyword (recherche, videos.list, générations et transcriptions en flux)
+- suggest : build_suggestion_tree + volumes Keywords Everywhere (Research)
+
+Chaque scénario est joué à froid (entrées jamais vues) puis à chaud (mêmes entrées, caches remplis).
+Rapporte p50/p95 par opération, débit et nombre d'appels par service.
+
+Usage : python -m benchmarks.bench_pipelines [--ops 20] [--concurrency 4] [--latency 0.05]
+        [--error-rate 0.02] [--scenarios video keyword suggest]
+"""
+import argparse
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Caches isolés : à définir avant le premier import de ytseo
+os.environ.setdefault("SEO_YOUTUBE_CACHE_DIR", tempfile.mkdtemp(prefix="seo-youtube-bench-"))
+
+from benchmarks.stub_server import StubServer  # noqa: E402
+from ytseo import llm, pipeline, quota, suggest  # noqa: E402
+from ytseo.volumes import VolumeService  # noqa: E402
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)] if ordered else 0.0
+
+
+def run_video(index: int, args):
+    pipeline.optimize_video("stub-yt", "stub-openai", f"https://www.youtube.com/watch?v=vid{index:05d}", 'fr')
+
+
+def run_keyword(index: int, args):
+    # Comme la page : transcriptions résumées en parallèle des générations
+    pipeline.optimize_top_videos("stub-yt", f"mot clé {index}", 'fr', "stub-openai", args.max_results,
+                                 with_transcripts=True)
+
+
+def run_suggest(index: int, args):
+    crawler = suggest.SuggestionCrawler('fr', fan_out=args.fan_out, depth=args.depth)
+    tree = crawler.build_tree(f"racine {index}")
+    keywords = [child for children in tree.values() for child in children]
+    VolumeService("stub-ke", country='fr', currency='EUR').lookup(keywords)
+
+
+SCENARIOS = {'video': run_video, 'keyword': run_keyword, 'suggest': run_suggest}
+
+
+def measure(server: StubServer, scenario, args, offset: int) -> dict:
+    """Joue `args.ops` opérations avec `args.concurrency` en parallèle."""
+    server.reset()
+
+    def timed(index: int) -> float:
+        start = time.perf_counter()
+        scenario(offset + index, args)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = list(pool.map(timed, range(args.ops)))
+    elapsed = time.perf_counter() - start
+    return {
+        'p50': percentile(latencies, 0.5),
+        'p95': percentile(latencies, 0.95),
+        'throughput': args.ops / elapsed,
+        'calls': dict(server.calls),
+        'errors': sum(server.errors.values()),
+    }
+
+
+def format_calls(calls: dict, ops: int) -> str:
+    return ", ".join(f"{name} {count / ops:.1f}" for name, count in sorted(calls.items())) or "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--ops", type=int, default=20, help="opérations par passe")
+    parser.add_argument("--concurrency", type=int, default=4, help="opérations simultanées")
+    parser.add_argument("--latency", type=float, default=0.05, help="latence simulée par requête (s)")
+    parser.add_argument("--llm-latency", type=float, default=None, help="latence propre à chat/completions (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="part des requêtes en erreur 503")
+    parser.add_argument("--transcript-words", type=int, default=1500)
+    parser.add_argument("--max-results", type=int, default=5, help="vidéos par mot-clé")
+    parser.add_argument("--fan-out", type=int, default=5)
+    parser.add_argument("--depth", type=int, default=2)
+    args = parser.parse_args()
+
+    latency = args.latency
+    if args.llm_latency is not None:
+        latency = {service: args.latency for service in ('youtube', 'suggest', 'keywords', 'transcripts')}
+        latency['openai'] = args.llm_latency
+
+    # Mesurer les parcours, pas les garde-fous : quota et limiteur de débit hors jeu
+    quota.get_planner().daily_budget = 10 ** 9
+    llm.configure(requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9)
+
+    print(f"caches : {os.environ['SEO_YOUTUBE_CACHE_DIR']}")
+    print(f"{'scénario':<9} | {'passe':<5} | {'p50':>8} | {'p95':>8} | {'débit':>9} | {'erreurs':>7} | appels par opération")
+    with StubServer(latency=latency, error_rate=args.error_rate, transcript_words=args.transcript_words) as server:
+        server.install()
+        for offset, name in enumerate(args.scenarios):
+            for label in ("froid", "chaud"):
+                result = measure(server, SCENARIOS[name], args, offset * 100_000)
+                print(f"{name:<9} | {label:<5} | {result['p50']:>7.3f}s | {result['p95']:>7.3f}s | "
+                      f"{result['throughput']:>6.2f}/s | {result['errors']:>7} | {format_calls(result['calls'], args.ops)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Compare la récupération des métadonnées vidéo une par une (N+1 appels)
+avec la récupération par lots de `youtube.fetch_videos` (cache vidé avant chaque mesure).
+
+Usage : python -m benchmarks.bench_video_metadata [--latency 0.05]
+"""
+import argparse
+import time
+
+import requests
+
+from benchmarks.stub_server import StubServer
+from ytseo import youtube
+from ytseo.cache import get_api_cache
+
+
+def fetch_one_by_one(api_key: str, video_ids: list) -> dict:
+    """Ancien comportement de get_top_videos : un GET videos.list par vidéo."""
+    items = {}
+    for video_id in video_ids:
+        url = f"{youtube.YOUTUBE_API_BASE}/videos?part={youtube.VIDEO_PARTS}&id={video_id}&key={api_key}"
+        response = requests.get(url)
+        response.raise_for_status()
+        items[video_id] = response.json().get('items', [])[0]
+    return items
+
+
+def measure(server: StubServer, func, video_ids: list):
+    server.reset()
+    get_api_cache().clear()
+    start = time.perf_counter()
+    result = func("stub-key", video_ids)
+    elapsed = time.perf_counter() - start
+    assert len(result) == len(video_ids)
+    return server.calls["videos"], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.05, help="Latence simulée par requête (s)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200])
+    args = parser.parse_args()
+
+    with StubServer(latency=args.latency) as server:
+        youtube.YOUTUBE_API_BASE = server.base_url
+        print(f"{'vidéos':>7} | {'appels N+1':>10} | {'temps N+1':>9} | {'appels lot':>10} | {'temps lot':>9}")
+        for size in args.sizes:
+            video_ids = [f"vid{i:05d}" for i in range(size)]
+            old_calls, old_time = measure(server, fetch_one_by_one, video_ids)
+            new_calls, new_time = measure(server, youtube.fetch_videos, video_ids)
+            print(f"{size:>7} | {old_calls:>10} | {old_time:>8.3f}s | {new_calls:>10} | {new_time:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Serveur HTTP local qui remplace tous les services externes pour les benchmarks :
+API YouTube Data v3 (search, videos), suggestions YouTube, OpenAI chat/completions
+(réponses simples, sorties structurées et flux SSE), Keywords Everywhere et transcriptions.
+Chaque requête est comptée ; latence et taux d'erreur sont réglables par service.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Union
+from urllib.parse import parse_qs, urlparse
+
+# Mots utilisés pour fabriquer des transcriptions et des textes générés réalistes
+VOCABULARY = (
+    "youtube référencement vidéo titre description miniature audience abonnés algorithme "
+    "mots-clés tendance chaîne contenu montage tutoriel astuce stratégie analyse engagement "
+    "commentaire partage visibilité recherche suggestion format durée public niche"
+).split()
+
+
+def fake_video(video_id: str) -> dict:
+    return {
+        'id': video_id,
+        'snippet': {
+            'title': f"Vidéo {video_id}",
+            'description': f"Description de la vidéo {video_id}",
+            'publishedAt': "2024-01-01T00:00:00Z",
+            'channelTitle': "Chaîne de test",
+            'categoryId': "22",
+        },
+        'contentDetails': {'duration': "PT4M13S"},
+        'statistics': {'viewCount': "1000", 'commentCount': "10"},
+    }
+
+
+def _rng(*parts) -> random.Random:
+    """Générateur déterministe : une même requête produit toujours la même réponse."""
+    return random.Random(hashlib.sha256("|".join(map(str, parts)).encode("utf-8")).digest())
+
+
+def _text(rng: random.Random, length: int) -> str:
+    words = []
+    while sum(len(word) + 1 for word in words) < length:
+        words.append(rng.choice(VOCABULARY))
+    return " ".join(words)[:length]
+
+
+def fake_metadata(prompt: str, fields) -> dict:
+    """Sortie structurée valide (longueurs et nombre de hashtags dans les bornes attendues)."""
+    rng = _rng(prompt)
+    values = {
+        'title': _text(rng, 53) + " 🚀",
+        'description': "Comment percer sur YouTube ? 👇 " + _text(rng, 420),
+        'hashtags': [f"#{word.replace('-', '')}" for word in rng.sample(VOCABULARY, 9)],
+    }
+    return {field: values[field] for field in fields}
+
+
+def fake_transcript(video_id: str, language: str, words: int) -> list:
+    """Segments de ~12 mots avec une ponctuation de temps en temps."""
+    rng = _rng(video_id, language)
+    segments = []
+    for start in range(0, words, 12):
+        text = " ".join(rng.choice(VOCABULARY) for _ in range(min(12, words - start)))
+        if rng.random() < 0.4:
+            text += "."
+        segments.append({'text': text, 'start': start * 0.4, 'duration': 4.8})
+    return segments
+
+
+def fake_tracks(video_id: str) -> list:
+    """Une vidéo sur cinq n'a aucun sous-titre ; les autres ont de l'anglais généré, parfois du français."""
+    index = int("".join(ch for ch in video_id if ch.isdigit()) or 0)
+    if index % 5 == 4:
+        return []
+    tracks = [{'language_code': 'en', 'language': 'English (auto-generated)', 'is_generated': True,
+               'is_translatable': True, 'translation_languages': [{'language_code': 'fr', 'language': 'French'}]}]
+    if index % 2 == 0:
+        tracks.append({'language_code': 'fr', 'language': 'Français', 'is_generated': False,
+                       'is_translatable': False, 'translation_languages': []})
+    return tracks
+
+
+class HttpTranscript:
+    """Piste servie par le serveur, avec l'interface Transcript de youtube-transcript-api."""
+
+    def __init__(self, base_url: str, video_id: str, track: dict, translate_to: Optional[str] = None):
+        self.base_url = base_url
+        self.video_id = video_id
+        self.language_code = track['language_code']
+        self.language = track['language']
+        self.is_generated = track['is_generated']
+        self.is_translatable = track.get('is_translatable', False)
+        self.translation_languages = track.get('translation_languages', [])
+        self._track = track
+        self._translate_to = translate_to
+
+    def fetch(self) -> List[dict]:
+        from ytseo import http_client
+        params = {'generated': int(self.is_generated)}
+        if self._translate_to:
+            params['translate'] = self._translate_to
+        response = http_client.get(f"{self.base_url}/{self.video_id}/{self.language_code}", params=params)
+        response.raise_for_status()
+        return response.json()['segments']
+
+    def translate(self, language_code: str) -> "HttpTranscript":
+        return HttpTranscript(self.base_url, self.video_id, self._track, language_code)
+
+
+class HttpTranscriptApi:
+    """Remplaçant de YouTubeTranscriptApi() branché par transcripts.use_backend."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def list(self, video_id: str) -> List[HttpTranscript]:
+        from ytseo import http_client
+        response = http_client.get(f"{self.base_url}/{video_id}")
+        response.raise_for_status()
+        return [HttpTranscript(self.base_url, video_id, track) for track in response.json()['tracks']]
+
+
+class StubServer:
+    """
+    Lance le serveur dans un thread. `latency` et `error_rate` sont soit une valeur commune,
+    soit un dictionnaire par service ('youtube', 'suggest', 'openai', 'keywords', 'transcripts').
+    Une erreur injectée répond 503, ce que le client HTTP partagé retente.
+    """
+
+    def __init__(self, latency: Union[float, Dict[str, float]] = 0.0,
+                 error_rate: Union[float, Dict[str, float]] = 0.0,
+                 transcript_words: int = 1500, seed: Optional[int] = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.transcript_words = transcript_words
+        self.calls = Counter()
+        self.errors = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def root_url(self) -> str:
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.root_url}/youtube/v3"
+
+    @property
+    def urls(self) -> Dict[str, str]:
+        """Variables d'environnement / attributs de module à pointer vers ce serveur."""
+        return {
+            'YOUTUBE_API_BASE': self.base_url,
+            'SUGGEST_URL': f"{self.root_url}/complete/search",
+            'OPENAI_API_BASE': f"{self.root_url}/v1",
+            'KEYWORDS_EVERYWHERE_URL': f"{self.root_url}/v1/get_keyword_data",
+        }
+
+    @property
+    def transcripts_url(self) -> str:
+        return f"{self.root_url}/transcripts"
+
+    def install(self):
+        """Redirige les modules ytseo déjà importés vers ce serveur, transcriptions comprises."""
+        from ytseo import llm, suggest, transcripts, volumes, youtube
+        urls = self.urls
+        youtube.YOUTUBE_API_BASE = urls['YOUTUBE_API_BASE']
+        suggest.SUGGEST_URL = urls['SUGGEST_URL']
+        llm.OPENAI_API_BASE = urls['OPENAI_API_BASE']
+        volumes.KEYWORDS_EVERYWHERE_URL = urls['KEYWORDS_EVERYWHERE_URL']
+        transcripts.use_backend(HttpTranscriptApi(self.transcripts_url))
+        return self
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+            self.errors.clear()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _setting(self, value, service: str) -> float:
+        return value.get(service, 0.0) if isinstance(value, dict) else value
+
+    def _before(self, service: str, endpoint: str) -> bool:
+        """Compte l'appel, applique la latence ; retourne False si une erreur doit être injectée."""
+        with self._lock:
+            self.calls[endpoint] += 1
+            failed = self._random.random() < self._setting(self.error_rate, service)
+            if failed:
+                self.errors[endpoint] += 1
+        time.sleep(self._setting(self.latency, service))
+        return not failed
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, body, status: int = 200):
+                payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _send_error(self):
+                self._send_json({'error': "injected failure"}, 503)
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                path = parsed.path.strip("/").split("/")
+
+                if path[:2] == ["youtube", "v3"] and path[2:] in (["search"], ["videos"]):
+                    endpoint = path[2]
+                    if not server._before('youtube', endpoint):
+                        return self._send_error()
+                    if endpoint == "search":
+                        count = int(params.get("maxResults", 5))
+                        offset = int(params.get("pageToken", "0") or 0)
+                        # Chaque requête a ses propres vidéos (blocs de 100 identifiants)
+                        first = _rng(params.get("q", "")).randrange(1, 900) * 100 + offset
+                        items = [{'id': {'videoId': f"vid{i:05d}"}} for i in range(first, first + count)]
+                        return self._send_json({'items': items, 'nextPageToken': str(offset + count)})
+                    return self._send_json({'items': [fake_video(v) for v in params.get("id", "").split(",") if v]})
+
+                if path == ["complete", "search"]:
+                    if not server._before('suggest', "suggest"):
+                        return self._send_error()
+                    query = params.get("q", "")
+                    rng = _rng(query)
+                    return self._send_json([query, [f"{query} {word}" for word in rng.sample(VOCABULARY, 10)]])
+
+                if path[:1] == ["transcripts"] and len(path) in (2, 3):
+                    endpoint = "transcript_list" if len(path) == 2 else "transcript_fetch"
+                    if not server._before('transcripts', endpoint):
+                        return self._send_error()
+                    if len(path) == 2:
+                        return self._send_json({'tracks': fake_tracks(path[1])})
+                    language = params.get("translate") or path[2]
+                    return self._send_json({'segments': fake_transcript(path[1], language, server.transcript_words)})
+
+                self._send_json({'error': "not found"}, 404)
+
+            def do_POST(self):
+                path = urlparse(self.path).path.strip("/").split("/")
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+                if path == ["v1", "chat", "completions"]:
+                    if not server._before('openai', "chat"):
+                        return self._send_error()
+                    return self._chat(json.loads(raw))
+
+                if path == ["v1", "get_keyword_data"]:
+                    if not server._before('keywords', "keyword_data"):
+                        return self._send_error()
+                    keywords = parse_qs(raw.decode("utf-8")).get("kw[]", [])
+                    rows = []
+                    for keyword in keywords:
+                        rng = _rng(keyword)
+                        rows.append({'keyword': keyword, 'vol': rng.randint(0, 50000),
+                                     'cpc': {'currency': "$", 'value': f"{rng.random() * 3:.2f}"},
+                                     'competition': round(rng.random(), 2)})
+                    return self._send_json({'data': rows})
+
+                self._send_json({'error': "not found"}, 404)
+
+            def _chat(self, body: dict):
+                prompt = body['messages'][-1]['content']
+                response_format = body.get('response_format')
+                if response_format:
+                    fields = list(response_format['json_schema']['schema']['properties'])
+                    content = json.dumps(fake_metadata(prompt, fields), ensure_ascii=False)
+                else:
+                    content = _text(_rng(prompt), 300)
+                usage = {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(content) // 4}
+                usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+                if not body.get('stream'):
+                    return self._send_json({'choices': [{'message': {'content': content}, 'finish_reason': "stop"}],
+                                            'usage': usage})
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                events = [{'choices': [{'delta': {'content': content[i:i + 12]}}]} for i in range(0, len(content), 12)]
+                events.append({'choices': [{'delta': {}, 'finish_reason': "stop"}]})
+                events.append({'choices': [], 'usage': usage})
+                for event in events:
+                    self._chunk(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self._chunk(b"data: [DONE]\n\n")
+                self._chunk(b"")
+
+            def _chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
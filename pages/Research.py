@@ -1,7 +1,10 @@
 import requests
 import streamlit as st
-from collections import defaultdict
 import json
+from typing import Callable, Dict, List, Optional
+
+from ytseo import clusters, suggest, suggest_index
+from ytseo import volumes as volumes_api
 
 # Configuration de la page Streamlit
 st.set_page_config(
@@ -10,30 +13,18 @@ st.set_page_config(
     page_icon="🔍"
 )
 
-def fetch_suggestions(query: str, language: str) -> list:
-    """Récupère les suggestions de recherche YouTube pour un mot-clé donné."""
-    url = f"https://suggestqueries.google.com/complete/search?client=firefox&ds=yt&hl={language}&q={query}"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        suggestions = response.json()[1]
-        return suggestions
-    except requests.RequestException as e:
-        st.error(f"Erreur lors de la récupération des suggestions : {e}")
-        return []
-
-def build_suggestion_tree(root_keyword: str, language: str, max_suggestions: int) -> dict:
+def build_suggestion_tree(root_keyword: str, language: str, max_suggestions: int, depth: int = 2,
+                          on_level: Optional[Callable[[int, Dict[str, List[str]]], None]] = None) -> dict:
     """
-    Construit un arbre de suggestions.
-    - Les suggestions du mot-clé de départ.
-    - Pour chaque suggestion, récupère les suggestions associées.
+    Construit un arbre de suggestions par parcours en largeur.
+    - Chaque niveau est récupéré en parallèle, sans redemander les doublons.
+    - `on_level` est appelé dès qu'un niveau est complet, pour l'afficher sans attendre la fin.
     """
-    tree = defaultdict(list)
-    root_suggestions = fetch_suggestions(root_keyword, language)[:max_suggestions]
-    for suggestion in root_suggestions:
-        tree[root_keyword].append(suggestion)
-        associated_suggestions = fetch_suggestions(suggestion, language)[:max_suggestions]
-        tree[suggestion].extend(associated_suggestions)
+    crawler = suggest.SuggestionCrawler(language, fan_out=max_suggestions, depth=depth)
+    tree = crawler.build_tree(root_keyword, on_level)
+    if crawler.errors:
+        query, error = crawler.errors[0]
+        st.error(f"Erreur lors de la récupération des suggestions ({len(crawler.errors)} échecs, ex. '{query}') : {error}")
     return tree
 
 def display_suggestions_table(suggestions: list):
@@ -47,8 +38,10 @@ def main():
     
     with st.sidebar:
         max_suggestions = st.slider("Nombre de suggestions à récupérer", 1, 10, 2)
+        depth = st.slider("Profondeur de l'arbre", 1, 4, 2)
         language = st.text_input("Langue de recherche (code)", value="en")
         api_key = st.text_input("Clé API Keyword Everywhere", type="password")
+        similarity = st.slider("Regrouper les variantes à partir de cette similarité", 0.5, 1.0, clusters.DEFAULT_THRESHOLD, 0.05)
     
     root_keyword = st.text_input("Entrez un mot-clé :", placeholder="Exemple : SEO YouTube")
     
@@ -57,42 +50,47 @@ def main():
             st.error("Veuillez entrer un mot-clé valide.")
         else:
             st.info("Recherche des suggestions en cours...")
-            tree = build_suggestion_tree(root_keyword, language, max_suggestions)
+            
+            def show_level(level: int, level_tree: Dict[str, List[str]]):
+                level_keywords = [child for children in level_tree.values() for child in children]
+                st.write(f"Niveau {level} : {len(level_keywords)} nouvelles suggestions")
+                if level_keywords:
+                    display_suggestions_table(level_keywords)
+            
+            tree = build_suggestion_tree(root_keyword, language, max_suggestions, depth, on_level=show_level)
             if tree:
                 st.success("Suggestions récupérées avec succès.")
+                # Toutes les réponses enregistrées sous ce mot-clé, y compris celles des explorations précédentes
+                subtree = suggest_index.get_suggestion_index().export(root_keyword, language)
+                st.download_button("Exporter les suggestions enregistrées (JSON)",
+                                   json.dumps(subtree, ensure_ascii=False, indent=2),
+                                   file_name="suggestions.json", mime="application/json")
                 keywords = [child for children in tree.values() for child in children]
-                display_suggestions_table(keywords)
-                volumes = get_keyword_volumes(keywords, api_key)
+                # Une seule demande de volume par groupe de variantes (ordre des mots, pluriels...)
+                groups = clusters.cluster_keywords(keywords, similarity)
+                st.caption(f"{len(keywords)} suggestions regroupées en {len(groups)} mots-clés distincts")
+                volumes = get_keyword_volumes([group[0] for group in groups], api_key) if api_key else {}
                 if volumes:
-                    st.write("Volumes de recherche des suggestions :")
-                    st.table(volumes)
+                    st.write("Volumes de recherche par groupe de suggestions :")
+                else:
+                    st.write("Suggestions par groupe (ajoutez une clé API Keyword Everywhere pour les volumes) :")
+                st.table(clusters.cluster_rows(tree, groups, volumes))
             else:
                 st.warning("Aucune suggestion trouvée.")
 
 def get_keyword_volumes(keywords, api_key):
-    url = 'https://api.keywordseverywhere.com/v1/get_keyword_data'
-    my_data = {
-        'country': 'us',
-        'currency': 'usd',
-        'dataSource': 'gkp',
-        'kw[]': keywords
-    }
-    my_headers = {
-        'Accept': 'application/json',
-        'Authorization': f'Bearer {api_key}'
-    }
-    response = requests.post(url, data=my_data, headers=my_headers)
-    if response.status_code == 200:
-        try:
-            data = response.json()
-            st.write("API Response:", data)  # Log the API response
-            return data
-        except ValueError:
-            st.error("Erreur lors de la récupération des volumes de recherche. Veuillez vérifier votre clé API et réessayer.")
-            return {}
-    else:
-        st.error(f"Erreur de l'API: {response.status_code} - {response.text}")
+    """Volumes des mots-clés (dédoublonnés, seuls les absents du cache sont facturés)."""
+    service = volumes_api.VolumeService(api_key, country='us', currency='usd', data_source='gkp')
+    try:
+        data = service.lookup(keywords)
+    except requests.HTTPError as e:
+        st.error(f"Erreur de l'API: {e.response.status_code} - {e.response.text}")
+        return {}
+    except (requests.RequestException, ValueError):
+        st.error("Erreur lors de la récupération des volumes de recherche. Veuillez vérifier votre clé API et réessayer.")
         return {}
+    st.caption(f"Cache des volumes : {service.hits} mots-clés déjà connus sur {service.hits + service.misses} ({service.hit_rate:.0%})")
+    return data
 
 if __name__ == "__main__":
     main()
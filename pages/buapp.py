@@ -1,27 +1,12 @@
 import requests
 from typing import List, Optional, Dict
-import json
-import openai   
 import streamlit as st
 
-# Tentative d'importation de youtube-transcript-api avec gestion d'erreurs
-try:
-    from youtube_transcript_api import YouTubeTranscriptApi, CouldNotRetrieveTranscript
-    TRANSCRIPT_API_AVAILABLE = True
-except ImportError as e:
-    st.error(f"youtube-transcript-api n'est pas installé. Veuillez exécuter: pip install youtube-transcript-api")
-    TRANSCRIPT_API_AVAILABLE = False
-    # Créer des classes fictives pour éviter les erreurs
-    class YouTubeTranscriptApi:
-        @staticmethod
-        def get_transcript(*args, **kwargs):
-            raise Exception("youtube-transcript-api not installed")
-        @staticmethod
-        def list_transcripts(*args, **kwargs):
-            raise Exception("youtube-transcript-api not installed")
-    
-    class CouldNotRetrieveTranscript(Exception):
-        pass
+from ytseo import categories, jobs, pipeline, quota, suggest, transcripts, ui, youtube
+from ytseo.cache import normalize_query
+
+# La bibliothèque n'est importée qu'au premier besoin d'une transcription
+TRANSCRIPT_API_AVAILABLE = transcripts.is_available()
 
 # Configuration de la page Streamlit
 st.set_page_config(
@@ -30,146 +15,40 @@ st.set_page_config(
     page_icon="🎥"
 )
 
-def GPT35(prompt, systeme, secret_key, temperature=0.7, model="gpt-4o-mini", max_tokens=1200):
-    url = "https://api.openai.com/v1/chat/completions"
-    
-    payload = {
-        "model": model,
-        "messages": [
-            {"role": "system", "content": systeme},
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": temperature,
-        "max_tokens": max_tokens
-    }
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {secret_key}"
-    }
-
-    response = requests.post(url, headers=headers, json=payload)
-    if response.status_code == 401:
-        st.error("Unauthorized access to OpenAI API. Please check your API key.")
-        return ""
-    response.raise_for_status()
-    return response.json()["choices"][0]["message"]["content"]
-
-def generate_optimized_title(api_key: str, video_title: str) -> str:
-    prompt = (f"Analyse le titre suivant d'une vidéo YouTube et génère une version optimisée pour le référencement, en tenant compte des mots-clés, de l'engagement et des bonnes pratiques SEO : {video_title}")
-    system_message = (f"Vous êtes un assistant de rédaction compétent et expérimenté, spécialisé dans l'optimisation SEO des contenus, "
-    "et particulièrement dans la création de titres optimisés pour YouTube. "
-    "Votre mission est de rédiger des titres engageants, informatifs et performants en termes de SEO, adaptés aux attentes de l'audience et aux bonnes pratiques de référencement. "
-    "Voici le système à suivre pour rédiger une title YouTube optimisée pour le SEO : "
-    "Identifier le sujet principal : Définir le thème ou le sujet de la vidéo et l’objectif principal (informer, expliquer, divertir, vendre). "
-    "Prioriser les mots-clés avec un fort volume de recherche et une concurrence modérée/faible. Considérer les variantes spécifiques liées à la niche ou au public cible. "
-    "Structure optimale de la title : Placer le mot-clé principal au début pour maximiser sa visibilité. "
-    "Ajouter un mot-clé secondaire ou un complément descriptif. Insérer des éléments engageants (chiffres, questions, superlatifs) pour inciter au clic. Utiliser les ? et ! pour impacter. "
-    "Utilisation des bonnes pratiques SEO : Respecter une longueur idéale de 50 à 60 caractères pour éviter la coupure dans les résultats de recherche. "
-    "Utiliser un langage clair, simple et engageant. Éviter les titres vagues ou génériques."
-    "Utiliser 1 ou 2 émojis pertinents pour capter l’attention. Utiliser les majuscules avec parcimonie pour mettre en valeur des mots-clés ou des éléments importants. "
-    "Incorporer des éléments attractifs : Ajouter un aspect unique ou une promesse claire (ex. : 'En 5 minutes', 'Sans expérience'). "
-    "Mettre en avant une solution ou un avantage spécifique. Poser une question pour capter l’attention ou susciter la curiosité. "
-    "Adapter au format vidéo et à l'audience : Pour des tutoriels, utiliser des formats comme 'Comment...', 'Guide pour...', 'Tuto'. "
-    "Pour des classements ou listes, utiliser 'Top X', 'Les X meilleurs...'. Pour des actualités ou analyses, inclure des termes comme '2024', 'Tendances', 'Analyse'."
-    "Réponds UNIQUEMENT avec la Réponse."
-)
-
-    optimized_title = GPT35(prompt, system_message, api_key)
-    return optimized_title
-
-def generate_optimized_description(api_key: str, video_description: str) -> str:
-    if not video_description:
-        return "No Original Description"
-    
-    prompt = (f"Analyse la description suivante d'une vidéo YouTube et génère une version optimisée pour le référencement, en tenant compte des mots-clés, de l'engagement et des bonnes pratiques SEO : {video_description}")
-    system_message = (f"Vous êtes un assistant de rédaction compétent et expérimenté, spécialisé dans l'optimisation SEO des contenus, "
-    "et particulièrement dans la création de descriptions optimisées pour YouTube. "
-    "Votre mission est de rédiger des descriptions de vidéos engageantes, informatives et performantes en termes de SEO, adaptées aux attentes de l'audience et aux bonnes pratiques de référencement. "
-    "Voici le système à suivre pour rédiger une description YouTube optimisée pour le SEO : "
-    "Identifier le sujet principal : Définir le thème ou le sujet de la vidéo et l’objectif principal (informer, expliquer, divertir, vendre). "
-    "Inclure des mots-clés pertinents liés au contenu de la vidéo. "
-    "Ajouter des variantes spécifiques pour maximiser la visibilité et couvrir des requêtes similaires. "
-    "Structure optimale de la description : La premiere phrase doit etre une question incitant TRES impactante pour le viewer en lien avec le mot clé principal. Utilise l'emoji 👇 juste apres la question. "
-    "Inclure des hashtags pertinents : Ajouter 8 à 10 hashtags stratégiques à la fin de la description pour améliorer la recherche. "
-    "Développer un résumé clair et attrayant du contenu de la vidéo dans les premières lignes. "
-    "Inclure des phrases contenant des mots-clés secondaires et des compléments pertinents. "
-    "Utilisation des bonnes pratiques SEO : Respecter une longueur idéale entre 400 et 500 caractères pour maximiser la visibilité dans les résultats de recherche. "
-    "Utiliser un langage clair, simple et engageant. Éviter les descriptions vagues, génériques ou trop répétitives. "
-    "Ajouter des éléments attractifs : Mettre en avant un aspect unique de la vidéo, une promesse claire ou un avantage spécifique (ex. : 'Apprenez en 5 minutes', 'Sans expérience'). "
-    "Poser une question pour inciter à l’engagement dans les commentaires ou à cliquer sur la vidéo. "
-    "Adapter au format vidéo et à l'audience : Pour des tutoriels, commencer par 'Comment...', 'Découvrez...', 'Guide pour...'. "
-    "Pour des classements ou listes, utiliser 'Top X', 'Les X meilleurs...'. Pour des analyses ou actualités, inclure des termes comme '2024', 'Tendances', 'Analyse'. "
-    "Ajouter des appels à l’action : Inclure des CTA (Call To Action) pour inviter les spectateurs à liker, s’abonner ou visiter un lien spécifique. "
-    "Votre priorité est de produire des descriptions engageantes et performantes en termes de SEO, tout en captant l’intérêt des spectateurs."
-    "Réponds UNIQUEMENT avec la Réponse."
-
-)
-
-    optimized_description = GPT35(prompt, system_message, api_key)
-    return optimized_description
-
-# Load category data from JSON file
-try:
-    with open('yt_category.json', 'r', encoding='utf-8') as f:
-        yt_category_data = json.load(f)
-except FileNotFoundError:
-    st.error("The file YT_CATEGORY.JSON was not found. Please ensure it is in the correct directory.")
-    yt_category_data = {}
-
-category_dict = {str(category['id']): category['name'] for category in yt_category_data.get('categories', [])}
-
-def get_top_videos(api_key: str, query: str, language: str, openai_api_key: str, max_results: int = 5) -> Optional[List[dict]]:
-    url = f"https://www.googleapis.com/youtube/v3/search?part=snippet&q={query}&type=video&maxResults={max_results}&relevanceLanguage={language}&key={api_key}"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        video_items = response.json().get('items', [])
-        
-        video_details = []
-        for item in video_items:
-            video_id = item['id']['videoId']
-            video_url = f"https://www.googleapis.com/youtube/v3/videos?part=snippet,contentDetails,statistics&id={video_id}&key={api_key}"
-            video_response = requests.get(video_url)
-            video_response.raise_for_status()
-            video_data = video_response.json().get('items', [])[0]
-            
-            original_title = video_data['snippet']['title']
-            optimized_title = generate_optimized_title(openai_api_key, original_title)
-            
-            original_description = video_data['snippet']['description']
-            optimized_description = generate_optimized_description(openai_api_key, original_description)
-            
-            video_details.append({
-                'original_title': original_title,
-                'optimized_title': optimized_title,
-                'original_description': original_description,
-                'optimized_description': optimized_description,
-                'views': int(video_data['statistics'].get('viewCount', 0)),
-                'length': video_data['contentDetails']['duration'],
-                'published_at': video_data['snippet']['publishedAt'],
-                'comments': int(video_data['statistics'].get('commentCount', 0)),
-                'url': f"https://www.youtube.com/watch?v={video_id}",
-                'category': video_data['snippet'].get('categoryId', 'N/A'),  # Category ID
-                'channel_title': video_data['snippet']['channelTitle']
-            })
-        
-        return video_details
-    except requests.RequestException as e:
-        st.error(f"Error fetching videos: {e}")
-        return None
+# Fréquence de rafraîchissement de l'analyse en cours (secondes)
+JOB_POLL_INTERVAL = 1.0
 
-def get_search_suggestions(api_key: str, query: str) -> Optional[List[str]]:
-    url = f"https://suggestqueries.google.com/complete/search?client=firefox&ds=yt&q={query}"
+def get_search_suggestions(api_key: str, query: str, language: Optional[str] = None) -> Optional[List[str]]:
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        suggestions = response.json()[1]
-        return suggestions
+        # Mémorisées par (requête normalisée, langue) : les relances du script ne refont pas l'appel
+        return suggest.get_live_suggestions().get(query, language)
     except requests.RequestException as e:
         st.error(f"Error fetching search suggestions: {e}")
         return None
 
+def format_transcript(digest: Optional[dict], language: str) -> str:
+    """Texte affiché pour une transcription résumée par pipeline.transcript_digest."""
+    if digest is None:
+        return "❌ Aucune transcription disponible pour cette vidéo"
+    
+    if digest['type'] == 'translated':
+        transcript_info = f"🌍 {digest['language'].upper()} (Traduit)"
+    elif digest['language'] == language:
+        transcript_info = f"✅ {language.upper()}"
+    else:
+        transcript_info = f"✅ {digest['language'].upper()} (Fallback)"
+    
+    duration_info = f" • ⏱️ {int(digest['duration'] // 60)}min" if digest['duration'] else ""
+    stats = f"📊 {digest['words']} mots • {digest['chars']} caractères{duration_info}"
+    
+    # Limitation pour l'affichage : extraits représentatifs de toute la vidéo
+    display_text = digest['summary']
+    displayed_words = len(display_text.split())
+    if displayed_words < digest['words']:
+        display_text += f"\n\n📋 [Résumé extractif : {displayed_words} mots sur {digest['words']}]"
+    
+    return f"{transcript_info}\n{stats}\n\n{display_text}"
+
 def analyze_video_content(video_id: str, language: str = 'fr') -> str:
     """
     Version simplifiée et robuste pour récupérer les transcriptions YouTube
@@ -178,84 +57,9 @@ def analyze_video_content(video_id: str, language: str = 'fr') -> str:
     if not TRANSCRIPT_API_AVAILABLE:
         return "❌ youtube-transcript-api non installé. Exécutez: pip install youtube-transcript-api"
     
-    transcript = None
-    transcript_info = "Inconnu"
-    
     try:
-        # Méthode 1: Essayer avec la langue préférée
-        try:
-            transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=[language])
-            transcript_info = f"✅ {language.upper()}"
-        except:
-            pass
-        
-        # Méthode 2: Essayer avec l'anglais si pas français
-        if transcript is None and language != 'en':
-            try:
-                transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=['en'])
-                transcript_info = "✅ EN (Fallback)"
-            except:
-                pass
-        
-        # Méthode 3: Essayer avec le français si pas français
-        if transcript is None and language != 'fr':
-            try:
-                transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=['fr'])
-                transcript_info = "✅ FR (Fallback)"
-            except:
-                pass
-        
-        # Méthode 4: Essayer sans spécifier de langue (auto-détection)
-        if transcript is None:
-            try:
-                transcript = YouTubeTranscriptApi.get_transcript(video_id)
-                transcript_info = "🤖 Auto-détecté"
-            except:
-                pass
-        
-        # Méthode 5: Essayer avec les langues les plus communes une par une
-        if transcript is None:
-            common_languages = ['en', 'fr', 'es', 'de', 'it', 'pt', 'ru', 'ja', 'ko', 'zh']
-            for lang in common_languages:
-                try:
-                    transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=[lang])
-                    transcript_info = f"🌍 {lang.upper()} (Trouvé)"
-                    break
-                except:
-                    continue
-        
-        if transcript:
-            # Traitement du texte
-            text = ' '.join([entry['text'] for entry in transcript])
-            text = text.replace('\n', ' ').replace('  ', ' ').strip()
-            
-            # Statistiques
-            word_count = len(text.split())
-            char_count = len(text)
-            
-            # Calculer la durée si possible
-            try:
-                duration_seconds = transcript[-1]['start'] + transcript[-1].get('duration', 0)
-                duration_minutes = int(duration_seconds // 60)
-                duration_info = f" • ⏱️ {duration_minutes}min"
-            except:
-                duration_info = ""
-            
-            # Limitation pour l'affichage
-            words = text.split()
-            display_text = text
-            if len(words) > 250:  # Réduire à 250 mots pour de meilleures performances
-                display_text = ' '.join(words[:250]) + f"\n\n📋 [...{word_count - 250} mots supplémentaires cachés...]"
-            
-            # Format de retour
-            header = f"{transcript_info}"
-            stats = f"📊 {word_count} mots • {char_count} caractères{duration_info}"
-            
-            return f"{header}\n{stats}\n\n{display_text}"
-            
-        else:
-            return "❌ Aucune transcription disponible pour cette vidéo"
-            
+        # Un seul listing des pistes, classement local, un seul téléchargement
+        return format_transcript(pipeline.transcript_digest(video_id, language), language)
     except Exception as e:
         return f"❌ Erreur générale: {str(e)[:150]}..."
 
@@ -273,7 +77,7 @@ def get_available_transcripts(video_id: str) -> Dict[str, List[str]]:
         return available_transcripts
     
     try:
-        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+        transcript_list = transcripts.list_transcripts(video_id)
         
         for transcript in transcript_list:
             lang_info = f"{transcript.language_code} ({transcript.language})"
@@ -298,127 +102,128 @@ def get_available_transcripts(video_id: str) -> Dict[str, List[str]]:
 
 def get_best_transcript(video_id: str, preferred_language: str = 'fr') -> Optional[Dict]:
     """
-    Récupère la meilleure transcription disponible selon une hiérarchie de préférence
-    Version corrigée avec gestion d'erreurs robuste
+    Récupère la meilleure transcription disponible selon une hiérarchie de préférence :
+    manuelle puis générée (langue préférée, puis repli), puis traduction, puis n'importe laquelle
     """
     if not TRANSCRIPT_API_AVAILABLE:
         return None
     
     try:
-        # Méthode 1: Essayer la méthode directe get_transcript avec différentes langues
-        language_priority = [preferred_language]
-        if preferred_language != 'en':
-            language_priority.append('en')
-        if preferred_language != 'fr':
-            language_priority.append('fr')
+        return transcripts.resolve_transcript(video_id, preferred_language)
+    except Exception:
+        return None
+
+def process_keyword(keyword: str, language: str, youtube_api_key: str, openai_api_key: str, max_results: int, regenerate: bool = False) -> None:
+    """
+    Lance l'analyse en arrière-plan (ou rejoint celle déjà en cours pour les mêmes paramètres)
+    et garde son identifiant dans la session : elle survit aux relances du script.
+    """
+    job_key = ('keyword', normalize_query(keyword), language, max_results, regenerate, youtube_api_key, openai_api_key)
+    manager = jobs.get_job_manager()
+    # Refuser avant de lancer plutôt que d'échouer à mi-parcours, sauf si la même analyse tourne déjà
+    cost = youtube.estimate_top_videos_cost(keyword, language, max_results)
+    planner = quota.get_planner()
+    if not manager.find_active(job_key) and not planner.can_afford(youtube_api_key, cost):
+        st.error(f"YouTube API quota: this search needs up to {cost} units, "
+                 f"{planner.remaining(youtube_api_key)} left today.")
+        return
+    job = manager.submit(
+        job_key,
+        lambda job: pipeline.optimize_top_videos(youtube_api_key, keyword, language, openai_api_key,
+                                                 max_results, regenerate, job=job,
+                                                 with_transcripts=TRANSCRIPT_API_AVAILABLE, max_units=cost),
+        label=f"Fetching top {max_results} videos for '{keyword}' in '{language}' language...",
+    )
+    st.session_state['keyword_job'] = job.id
+
+def show_videos(top_videos: List[dict], language: str) -> None:
+    """Une ligne par vidéo dès qu'elle est connue ; les champs encore en cours sont signalés."""
+    for video in top_videos:
+        st.write(f"#{video['rank']} {video['original_title']} Channel: {video['channel_title']}")
+        st.write(f"URL: {video['url']} Category: {categories.category_name(video['category'])} Views: {video['views']:,} Length: {video['length']} Published at: {video['published_at']} Comments: {video['comments']:,}")
         
-        # Essayer d'abord avec chaque langue individuellement
-        for lang in language_priority:
-            try:
-                transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=[lang])
-                return {
-                    'transcript': transcript,
-                    'language': lang,
-                    'language_name': f"{lang.upper()}",
-                    'type': 'auto_detected',
-                    'is_generated': True  # On assume que c'est généré par défaut
-                }
-            except Exception:
-                continue
+        with st.expander("Details"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.write("Original Title")
+                st.write(video['original_title'])
+                st.write("Original Description")
+                st.write(video['original_description'])
+            with col2:
+                if 'optimization_error' in video:
+                    st.write(f"❌ Génération impossible: {video['optimization_error'][:150]}...")
+                else:
+                    st.write("Optimized Title")
+                    st.write(video.get('optimized_title', "⏳ Génération en cours..."))
+                    st.write("Optimized Description")
+                    st.write(video.get('optimized_description', "⏳ Génération en cours..."))
+            with col3:
+                st.write("Transcript")
+                if not TRANSCRIPT_API_AVAILABLE:
+                    st.write(analyze_video_content(video['url'].split('=')[-1], language))
+                elif 'transcript_error' in video:
+                    st.write(f"❌ Erreur générale: {video['transcript_error'][:150]}...")
+                elif 'transcript' in video:
+                    st.write(format_transcript(video['transcript'], language))
+                else:
+                    st.write("⏳ Transcription en cours...")
+
+def show_keyword_job() -> None:
+    """Progression et résultats (partiels) de l'analyse de la session, rafraîchis tant qu'elle tourne."""
+    job = jobs.get_job_manager().get(st.session_state.get('keyword_job'))
+    if job is None:
+        return
+    
+    @st.fragment(run_every=JOB_POLL_INTERVAL if job.active else None)
+    def job_panel():
+        was_active = job.active
+        st.write(job.label)
+        if job.active:
+            st.progress(job.progress, text=job.stage or "En attente...")
+            if st.button("Cancel", key="cancel_keyword_job"):
+                job.cancel()
+        elif job.status == jobs.FAILED:
+            st.error(f"Error fetching videos: {job.error}")
+        elif job.status == jobs.CANCELLED:
+            st.warning("Analyse annulée.")
         
-        # Méthode 2: Essayer sans spécifier de langue (première disponible)
-        try:
-            transcript = YouTubeTranscriptApi.get_transcript(video_id)
-            return {
-                'transcript': transcript,
-                'language': 'auto',
-                'language_name': "Auto-détecté",
-                'type': 'auto_available',
-                'is_generated': True
-            }
-        except Exception:
-            pass
+        top_videos = job.results
+        if top_videos:
+            st.write(f"\nTop {len(top_videos)} Related Videos:")
+            show_videos(top_videos, job.key[2])
         
-        # Méthode 3: Essayer avec list_transcripts si disponible
-        try:
-            if hasattr(YouTubeTranscriptApi, 'list_transcripts'):
-                transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-                
-                # Chercher d'abord les transcriptions manuelles
-                for transcript_obj in transcript_list:
-                    try:
-                        if transcript_obj.language_code in language_priority and not transcript_obj.is_generated:
-                            return {
-                                'transcript': transcript_obj.fetch(),
-                                'language': transcript_obj.language_code,
-                                'language_name': transcript_obj.language,
-                                'type': 'manual',
-                                'is_generated': False
-                            }
-                    except Exception:
-                        continue
-                
-                # Ensuite les transcriptions auto-générées
-                for transcript_obj in transcript_list:
-                    try:
-                        if transcript_obj.language_code in language_priority:
-                            return {
-                                'transcript': transcript_obj.fetch(),
-                                'language': transcript_obj.language_code,
-                                'language_name': transcript_obj.language,
-                                'type': 'generated',
-                                'is_generated': True
-                            }
-                    except Exception:
-                        continue
-                
-                # Prendre n'importe quelle transcription disponible
-                for transcript_obj in transcript_list:
-                    try:
-                        return {
-                            'transcript': transcript_obj.fetch(),
-                            'language': transcript_obj.language_code,
-                            'language_name': transcript_obj.language,
-                            'type': 'fallback',
-                            'is_generated': getattr(transcript_obj, 'is_generated', True)
-                        }
-                    except Exception:
-                        continue
-        except Exception:
-            pass
-                
-    except Exception as e:
-        pass
+        # Fin de la tâche : une dernière relance complète arrête le rafraîchissement
+        if was_active and not job.active:
+            st.rerun()
     
-    return None
+    job_panel()
 
-def process_keyword(keyword: str, language: str, youtube_api_key: str, openai_api_key: str, max_results: int) -> None:
-    st.write(f"\nFetching top {max_results} videos for '{keyword}' in '{language}' language...")
+def show_keyword_gap(youtube_api_key: str) -> None:
+    """Termes des vidéos concurrentes absents de notre vidéo, recalculés pour chaque analyse terminée."""
+    job = jobs.get_job_manager().get(st.session_state.get('keyword_job'))
+    if job is None or job.active or not job.results:
+        return
     
-    # Fetch top videos
-    top_videos = get_top_videos(youtube_api_key, keyword, language, openai_api_key, max_results)
-    if top_videos:
-        st.write(f"\nTop {max_results} Related Videos:")
-        for i, video in enumerate(top_videos, 1):
-            st.write(f"#{i} {video['original_title']} Channel: {video['channel_title']}")
-            st.write(f"URL: {video['url']} Category: {category_dict.get(video['category'], 'Unknown')} Views: {video['views']:,} Length: {video['length']} Published at: {video['published_at']} Comments: {video['comments']:,}")
-            
-            with st.expander("Details"):
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.write("Original Title")
-                    st.write(video['original_title'])
-                    st.write("Original Description")
-                    st.write(video['original_description'])
-                with col2:
-                    st.write("Optimized Title")
-                    st.write(video['optimized_title'])
-                    st.write("Optimized Description")
-                    st.write(video['optimized_description'])
-                with col3:
-                    st.write("Transcript")
-                    transcript = analyze_video_content(video['url'].split('=')[-1], language)
-                    st.write(transcript)
+    st.subheader("Keyword gap")
+    own_url = st.text_input("Your video URL (terms the competitors share that it is missing):", key="gap_video_url")
+    if not own_url:
+        return
+    
+    cache_key = ('keyword_gap', job.id, own_url)
+    if cache_key not in st.session_state:
+        own_details = ui.get_video_details(youtube_api_key, own_url)
+        if not own_details:
+            return
+        st.session_state[cache_key] = pipeline.keyword_gap(own_details, job.results, job.key[2])
+    terms = st.session_state[cache_key]
+    if terms:
+        st.dataframe(
+            [{'term': t['term'], 'videos': t['videos'], 'share': f"{t['share']:.0%}",
+              'in titles': t['in_titles'], 'score': round(t['score'], 4)} for t in terms],
+            hide_index=True,
+        )
+    else:
+        st.info("Aucun terme partagé par les concurrents ne manque à cette vidéo.")
 
 def main():
     st.title("Youtube SEO Assistant")
@@ -430,6 +235,7 @@ def main():
     with st.sidebar:
         youtube_api_key = st.text_input("Enter your YouTube API key:")
         openai_api_key = st.text_input("Enter your OpenAI API key:")
+        ui.sidebar_cache_stats()
         
         # Section de test de transcription dans la sidebar
         st.sidebar.markdown("---")
@@ -445,7 +251,7 @@ def main():
                 
                 # Test 1: Sans langue
                 try:
-                    transcript = YouTubeTranscriptApi.get_transcript(test_video_id)
+                    transcript = transcripts.fetch_transcript(test_video_id, use_store=False)
                     st.sidebar.success(f"✅ Sans langue: {len(transcript)} entrées")
                     methods_tested.append("sans_langue")
                 except Exception as e:
@@ -453,7 +259,7 @@ def main():
                 
                 # Test 2: Français
                 try:
-                    transcript = YouTubeTranscriptApi.get_transcript(test_video_id, languages=['fr'])
+                    transcript = transcripts.fetch_transcript(test_video_id, ['fr'], use_store=False)
                     st.sidebar.success(f"✅ Français: {len(transcript)} entrées")
                     methods_tested.append("francais")
                 except Exception as e:
@@ -461,7 +267,7 @@ def main():
                 
                 # Test 3: Anglais
                 try:
-                    transcript = YouTubeTranscriptApi.get_transcript(test_video_id, languages=['en'])
+                    transcript = transcripts.fetch_transcript(test_video_id, ['en'], use_store=False)
                     st.sidebar.success(f"✅ Anglais: {len(transcript)} entrées")
                     methods_tested.append("anglais")
                 except Exception as e:
@@ -480,15 +286,16 @@ def main():
     with col1:
         keyword = st.text_input("Enter a keyword to fetch top videos:")
         language = st.selectbox("Enter the language code (e.g., 'en' for English, 'fr' for French):", options=['en', 'fr'], index=1)
-        max_results = st.slider("Select the number of top videos to fetch (and the number of transcripts):", 1, 10, 5)
+        max_results = st.slider("Select the number of top videos to fetch (and the number of transcripts):", 1, 200, 5)
     
+    regenerate = st.checkbox("Regenerate (ignore cached answers)")
     fetch_videos = st.button("Fetch Videos")
     
     if not fetch_videos:
         with col2:
             if keyword:
                 st.write(f"Search Suggestions for '{keyword}':")
-                suggestions = get_search_suggestions(youtube_api_key, keyword)
+                suggestions = get_search_suggestions(youtube_api_key, keyword, language)
                 if suggestions:
                     for suggestion in suggestions[:10]:
                         st.write(f"{suggestion}")
@@ -497,7 +304,15 @@ def main():
         if not youtube_api_key or not openai_api_key:
             st.error("Please provide both YouTube API key and OpenAI API key.")
         else:
-            process_keyword(keyword, language, youtube_api_key, openai_api_key, max_results)
+            process_keyword(keyword, language, youtube_api_key, openai_api_key, max_results, regenerate)
+    
+    show_keyword_job()
+    show_keyword_gap(youtube_api_key)
+    
+    # En fin de script : le quota affiché inclut les appels de cette exécution
+    with st.sidebar:
+        ui.sidebar_quota(youtube_api_key)
+        ui.sidebar_metrics()
 
 if __name__ == "__main__":
     main()
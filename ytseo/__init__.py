@@ -0,0 +1 @@
+"""Briques partagées par les pages Streamlit de SEO Youtube Box."""
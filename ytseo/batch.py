@@ -0,0 +1,225 @@
+"""
+Traitement par lots, sans Streamlit : optimise une liste d'URLs de vidéos ou de mots-clés
+(CSV ou JSONL) et écrit un résultat JSONL au fil de l'eau.
+
+    python -m ytseo.batch catalogue.csv resultats.jsonl --concurrency 8
+
+Le fichier de sortie sert aussi de point de reprise : relancée après un arrêt, la commande
+ignore les entrées déjà traitées avec succès et ne retente que les autres.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Set
+
+from ytseo import llm, metrics, pipeline
+from ytseo.cache import get_api_cache
+
+DEFAULT_CONCURRENCY = 4
+# Colonnes / clés reconnues dans le fichier d'entrée
+VIDEO_FIELDS = ("url", "video_url", "video")
+KEYWORD_FIELDS = ("keyword", "query", "mot_cle")
+PROGRESS_EVERY = 25
+
+
+def _detect_kind(value: str) -> str:
+    return 'video' if "youtube.com/" in value or "youtu.be/" in value else 'keyword'
+
+
+def _to_item(record: Dict[str, str]) -> Optional[dict]:
+    for field in VIDEO_FIELDS:
+        if record.get(field):
+            return {'kind': 'video', 'input': record[field].strip()}
+    for field in KEYWORD_FIELDS:
+        if record.get(field):
+            return {'kind': 'keyword', 'input': record[field].strip()}
+    return None
+
+
+def read_items(path: str, kind: str = 'auto') -> Iterator[dict]:
+    """
+    Lit les entrées d'un CSV (colonne url/keyword, ou première colonne) ou d'un JSONL
+    ({"url": ...} / {"keyword": ...}). `kind` force le type ('video' ou 'keyword').
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith(".jsonl"):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            sample = f.readline()
+            f.seek(0)
+            names = [name.strip().lower() for name in next(csv.reader([sample]), [])]
+            if set(names) & set(VIDEO_FIELDS + KEYWORD_FIELDS):
+                records = ({(k or "").strip().lower(): v for k, v in row.items()} for row in csv.DictReader(f))
+            else:
+                records = ({'value': row[0]} for row in csv.reader(f) if row)
+        for record in records:
+            item = _to_item(record)
+            if item is None and record.get('value', "").strip():
+                value = record['value'].strip()
+                item = {'kind': _detect_kind(value), 'input': value}
+            if item is None:
+                continue
+            if kind != 'auto':
+                item['kind'] = kind
+            yield item
+
+
+def _item_key(item: dict) -> str:
+    return f"{item['kind']}:{item['input']}"
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    """
+    Entrées déjà traitées avec succès dans un fichier de sortie existant.
+    Une dernière ligne incomplète (arrêt brutal pendant l'écriture) est supprimée.
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+    done = set()
+    for line in data.decode('utf-8').splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get('status') == 'ok':
+            done.add(_item_key(record))
+    return done
+
+
+def process_item(item: dict, args: argparse.Namespace) -> dict:
+    """Traite une entrée ; les erreurs sont consignées dans le résultat plutôt que relevées."""
+    started = time.perf_counter()
+    record = {'kind': item['kind'], 'input': item['input']}
+    try:
+        if item['kind'] == 'video':
+            record['result'] = pipeline.optimize_video(args.youtube_api_key, args.openai_api_key, item['input'],
+                                                       args.language, args.regenerate)
+        else:
+            record['result'] = pipeline.optimize_top_videos(args.youtube_api_key, item['input'], args.language,
+                                                            args.openai_api_key, args.max_results, args.regenerate)
+        record['status'] = 'ok'
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['seconds'] = round(time.perf_counter() - started, 3)
+    return record
+
+
+class ResultWriter:
+    """Ajoute les résultats au fichier JSONL, une ligne complète et vidée sur disque à la fois."""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Traite toutes les entrées avec au plus `concurrency` en cours ; retourne le bilan."""
+    done = load_checkpoint(args.output)
+    llm.configure(max_concurrency=args.concurrency)
+    writer = ResultWriter(args.output)
+    summary = {'ok': 0, 'error': 0, 'skipped': 0}
+    started = time.perf_counter()
+    items = read_items(args.input, args.kind)
+    pending = set()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="batch") as pool:
+            try:
+                for item in items:
+                    if _item_key(item) in done:
+                        summary['skipped'] += 1
+                        continue
+                    done.add(_item_key(item))
+                    # Fenêtre bornée : le fichier d'entrée n'est jamais chargé en entier
+                    if len(pending) >= args.concurrency * 2:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        _collect(finished, writer, summary, started)
+                    pending.add(pool.submit(process_item, item, args))
+                finished, pending = wait(pending)
+                _collect(finished, writer, summary, started)
+            except KeyboardInterrupt:
+                # Les entrées en cours se terminent et sont écrites, les autres seront reprises
+                for future in pending:
+                    future.cancel()
+                finished, _ = wait(pending)
+                _collect([future for future in finished if not future.cancelled()], writer, summary, started)
+                print("Interrompu : relancer la même commande pour reprendre.", file=sys.stderr)
+    finally:
+        writer.close()
+    summary['seconds'] = time.perf_counter() - started
+    return summary
+
+
+def _collect(futures, writer: ResultWriter, summary: dict, started: float):
+    for future in futures:
+        record = future.result()
+        writer.write(record)
+        summary[record['status']] += 1
+        processed = summary['ok'] + summary['error']
+        if processed % PROGRESS_EVERY == 0:
+            print(f"{processed} traités ({processed / (time.perf_counter() - started):.2f}/s)", file=sys.stderr)
+
+
+def format_summary(summary: dict) -> str:
+    processed = summary['ok'] + summary['error']
+    api_stats = get_api_cache().stats()
+    llm_stats = llm.get_llm_cache().stats()
+    return "\n".join([
+        f"Traités : {processed} ({summary['ok']} ok, {summary['error']} erreurs), "
+        f"déjà faits : {summary['skipped']}",
+        f"Durée : {summary['seconds']:.1f}s, débit : {processed / max(summary['seconds'], 1e-9):.2f} entrées/s",
+        f"Cache API : {api_stats['hits']} hits / {api_stats['misses']} misses, "
+        f"cache LLM : {llm_stats['hits']} hits ({llm_stats['tokens_saved']:,} tokens économisés)",
+    ])
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m ytseo.batch", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="CSV ou JSONL d'URLs de vidéos et/ou de mots-clés")
+    parser.add_argument("output", help="fichier JSONL de résultats (et de reprise)")
+    parser.add_argument("--kind", choices=("auto", "video", "keyword"), default="auto",
+                        help="type des entrées (auto : URL YouTube => vidéo, sinon mot-clé)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="entrées traitées en parallèle")
+    parser.add_argument("--language", default="fr")
+    parser.add_argument("--max-results", type=int, default=5, help="vidéos par mot-clé")
+    parser.add_argument("--regenerate", action="store_true", help="ignorer les réponses LLM en cache")
+    parser.add_argument("--youtube-api-key", default=os.environ.get("YOUTUBE_API_KEY"))
+    parser.add_argument("--openai-api-key", default=os.environ.get("OPENAI_API_KEY"))
+    args = parser.parse_args(argv)
+    if not args.youtube_api_key or not args.openai_api_key:
+        parser.error("clés API manquantes (--youtube-api-key/--openai-api-key ou YOUTUBE_API_KEY/OPENAI_API_KEY)")
+    if args.concurrency < 1:
+        parser.error("--concurrency doit être >= 1")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    metrics.start_from_environment()
+    summary = run(args)
+    print(format_summary(summary), file=sys.stderr)
+    return 1 if summary['error'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
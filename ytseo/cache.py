@@ -0,0 +1,135 @@
+"""Cache disque (SQLite) à durée de vie limitée pour les réponses des API."""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+CACHE_DIR = os.environ.get("SEO_YOUTUBE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "seo-youtube"))
+DEFAULT_MAX_ENTRIES = 50_000
+# Paramètres jamais pris en compte dans la clé (secrets)
+EXCLUDED_PARAMS = ("key",)
+# Paramètres dont la casse et les espaces ne changent pas la réponse
+NORMALIZED_PARAMS = ("q",)
+
+
+def normalize_query(query: str) -> str:
+    """Minuscules et espaces compactés : 'SEO  YouTube ' -> 'seo youtube'."""
+    return " ".join(query.lower().split())
+
+
+def make_key(endpoint: str, params: Dict[str, Any]) -> str:
+    """Clé stable : point d'accès normalisé + paramètres triés, sans la clé API."""
+    items = []
+    for name in sorted(params):
+        if name in EXCLUDED_PARAMS or params[name] is None:
+            continue
+        value = str(params[name]).strip()
+        if name in NORMALIZED_PARAMS:
+            value = normalize_query(value)
+        items.append([name, value])
+    return f"{endpoint.strip('/').lower()}?{json.dumps(items, ensure_ascii=False, separators=(',', ':'))}"
+
+
+class ApiCache:
+    """
+    Cache clé/valeur JSON avec TTL par entrée et éviction LRU au-delà de `max_entries`.
+    Le fichier SQLite est partagé entre sessions et processus.
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes_since_check = 0
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection().execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 n'autorise pas le partage d'une connexion entre threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            if self.path != ":memory:":
+                connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        connection = self._connection()
+        row = connection.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= now:
+            if row is not None:
+                connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            with self._lock:
+                self.misses += 1
+            return None
+        connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        with self._lock:
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float):
+        now = time.time()
+        self._connection().execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), now + ttl, now),
+        )
+        with self._lock:
+            self._writes_since_check += 1
+            check = self._writes_since_check >= 100
+            if check:
+                self._writes_since_check = 0
+        if check:
+            self.evict()
+
+    def evict(self):
+        """Supprime les entrées expirées puis les moins récemment lues au-delà de la limite."""
+        connection = self._connection()
+        connection.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        (count,) = connection.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count > self.max_entries:
+            excess = count - self.max_entries
+            connection.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+            with self._lock:
+                self.evictions += excess
+
+    def clear(self):
+        self._connection().execute("DELETE FROM entries")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+_api_cache: Optional[ApiCache] = None
+_api_cache_lock = threading.Lock()
+
+
+def get_api_cache() -> ApiCache:
+    """Cache partagé par tout le processus, stocké dans CACHE_DIR/api_cache.sqlite."""
+    global _api_cache
+    with _api_cache_lock:
+        if _api_cache is None:
+            _api_cache = ApiCache(os.path.join(CACHE_DIR, "api_cache.sqlite"))
+        return _api_cache
@@ -0,0 +1,172 @@
+"""
+Regroupement des suggestions quasi identiques (ordre des mots, pluriels, accents, mots vides)
+par signatures MinHash et LSH par bandes : le coût reste proche du linéaire en nombre de
+mots-clés, sans comparer toutes les paires. Un représentant par groupe est envoyé
+au service de volumes.
+"""
+import re
+import unicodedata
+import zlib
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from ytseo.cache import normalize_query
+from ytseo.summarize import STOPWORDS
+
+if TYPE_CHECKING:
+    import numpy
+
+# Similarité de Jaccard (estimée) à partir de laquelle deux mots-clés sont des variantes
+DEFAULT_THRESHOLD = 0.8
+NUM_PERMUTATIONS = 64
+# 16 bandes de 4 : les paires au-dessus d'environ 0,5 de similarité deviennent candidates
+BANDS = 16
+# Mots-clés traités par bloc pour borner la mémoire des matrices de hachage
+CHUNK_SIZE = 4096
+
+_TOKEN = re.compile(r"\w+")
+# Mots vides courts absents de STOPWORDS (qui ne garde que les mots de 3 lettres et plus)
+_SHORT_STOPWORDS = frozenset("de du la le l d en et a au un of to in on the for".split())
+
+
+def _numpy():
+    # NumPy n'est chargé qu'au premier regroupement
+    import numpy
+    return numpy
+
+
+def _fold(text: str) -> str:
+    """Minuscules sans accents : « Vidéos » et « videos » se confondent."""
+    decomposed = unicodedata.normalize("NFKD", normalize_query(text))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _stem(token: str) -> str:
+    """Pluriel simple (français et anglais) : astuces -> astuce, jeux -> jeu."""
+    if len(token) > 3 and token[-1] in "sx" and token[-2] != "s":
+        return token[:-1]
+    return token
+
+
+def keyword_features(keyword: str) -> frozenset:
+    """Ensemble des mots significatifs racinisés : insensible à l'ordre, aux pluriels et aux mots vides."""
+    tokens = [_stem(token) for token in _TOKEN.findall(_fold(keyword))]
+    features = frozenset(token for token in tokens if token not in STOPWORDS and token not in _SHORT_STOPWORDS)
+    return features or frozenset(tokens)
+
+
+def minhash_signatures(feature_sets: List[frozenset], num_permutations: int = NUM_PERMUTATIONS,
+                       seed: int = 0) -> "numpy.ndarray":
+    """
+    Signatures MinHash (une ligne par ensemble), par hachage multiplicatif sur 64 bits :
+    h(x) = (a·x + b) >> 32, a impair. Un ensemble vide a une signature de valeurs maximales.
+    """
+    np = _numpy()
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2 ** 63, size=num_permutations, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 2 ** 63, size=num_permutations, dtype=np.uint64)
+    signatures = np.full((len(feature_sets), num_permutations), np.iinfo(np.uint64).max, dtype=np.uint64)
+    for start in range(0, len(feature_sets), CHUNK_SIZE):
+        chunk = feature_sets[start:start + CHUNK_SIZE]
+        sizes = np.fromiter((len(features) for features in chunk), dtype=np.int64, count=len(chunk))
+        filled = np.flatnonzero(sizes)
+        if not len(filled):
+            continue
+        values = np.fromiter((zlib.crc32(feature.encode("utf-8")) for features in chunk for feature in features),
+                             dtype=np.uint64, count=int(sizes.sum()))
+        # Les produits débordent volontairement (arithmétique modulo 2^64)
+        hashed = (values[:, None] * a[None, :] + b[None, :]) >> np.uint64(32)
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        signatures[start + filled] = np.minimum.reduceat(hashed, offsets[filled], axis=0)
+    return signatures
+
+
+def _band_keys(signatures: "numpy.ndarray", bands: int) -> "numpy.ndarray":
+    """Une empreinte par (mot-clé, bande), combinaison des valeurs de la bande."""
+    np = _numpy()
+    rows = signatures.shape[1] // bands
+    banded = signatures[:, :bands * rows].reshape(len(signatures), bands, rows)
+    multipliers = np.uint64(0x9E3779B97F4A7C15) ** np.arange(1, rows + 1, dtype=np.uint64)
+    return (banded * multipliers).sum(axis=2, dtype=np.uint64)
+
+
+def cluster_keywords(keywords: List[str], threshold: float = DEFAULT_THRESHOLD,
+                     num_permutations: int = NUM_PERMUTATIONS, bands: int = BANDS, seed: int = 0) -> List[List[str]]:
+    """
+    Groupes de variantes, dans l'ordre de première apparition ; le premier mot-clé de chaque
+    groupe (le plus proche de la racine dans un parcours en largeur) en est le représentant.
+    Les doublons exacts (après normalisation) sont fusionnés.
+    """
+    np = _numpy()
+    first_seen: Dict[str, str] = {}
+    for keyword in keywords:
+        first_seen.setdefault(normalize_query(keyword), keyword)
+    unique = list(first_seen.values())
+    if len(unique) < 2:
+        return [[keyword] for keyword in unique]
+
+    feature_sets = [keyword_features(keyword) for keyword in unique]
+    signatures = minhash_signatures(feature_sets, num_permutations, seed)
+    keys = _band_keys(signatures, bands)
+
+    # Dans chaque seau (même empreinte sur une bande), chaque membre est comparé au premier arrivé
+    members, leaders = [], []
+    for band in range(keys.shape[1]):
+        order = np.argsort(keys[:, band], kind="stable")
+        sorted_keys = keys[order, band]
+        starts = np.concatenate([[True], sorted_keys[1:] != sorted_keys[:-1]])
+        leader = order[np.flatnonzero(starts)[np.cumsum(starts) - 1]]
+        linked = leader != order
+        members.append(order[linked])
+        leaders.append(leader[linked])
+    members, leaders = np.concatenate(members), np.concatenate(leaders)
+    pairs = np.unique(np.stack([members, leaders], axis=1), axis=0) if len(members) else np.empty((0, 2), int)
+    similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+    # Sans aucun mot (ponctuation seule), les signatures sont identiques sans rien partager
+    empty = np.fromiter((not features for features in feature_sets), dtype=bool, count=len(feature_sets))
+    pairs = pairs[(similarity >= threshold) & ~empty[pairs[:, 0]] & ~empty[pairs[:, 1]]]
+
+    # Union-find : la racine d'un groupe est toujours son mot-clé le plus ancien
+    parent = list(range(len(unique)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for member, leader in pairs.tolist():
+        root_a, root_b = find(member), find(leader)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    groups: Dict[int, List[str]] = {}
+    for index, keyword in enumerate(unique):
+        groups.setdefault(find(index), []).append(keyword)
+    return list(groups.values())
+
+
+def cluster_rows(tree: Dict[str, List[str]], clusters: List[List[str]],
+                 volumes: Optional[Dict[str, dict]] = None) -> List[dict]:
+    """
+    Une ligne par groupe : représentant, son parent dans l'arbre et variantes ; avec `volumes`,
+    le volume, le CPC et la concurrence du représentant.
+    """
+    parents = {normalize_query(child): parent for parent, children in tree.items() for child in children}
+    rows = []
+    for cluster in clusters:
+        representative = cluster[0]
+        row = {
+            'parent': parents.get(normalize_query(representative), ""),
+            'keyword': representative,
+            'variants': ", ".join(cluster[1:]),
+        }
+        if volumes:
+            data = volumes.get(normalize_query(representative), {})
+            cpc = data.get('cpc')
+            row.update({
+                'vol': data.get('vol'),
+                'cpc': cpc.get('value') if isinstance(cpc, dict) else cpc,
+                'competition': data.get('competition'),
+            })
+        rows.append(row)
+    return rows
@@ -0,0 +1,133 @@
+"""
+Analyse des écarts de mots-clés : matrice TF-IDF creuse (unigrammes et bigrammes) sur les titres,
+descriptions et transcriptions des vidéos concurrentes, puis classement des termes qu'elles
+partagent et que notre vidéo n'emploie pas. Calculs vectorisés NumPy, matrice au format CSR.
+"""
+import re
+from typing import TYPE_CHECKING, Dict, List, NamedTuple
+
+from ytseo.summarize import STOPWORDS
+
+if TYPE_CHECKING:
+    import numpy
+
+# Un terme du titre pèse plus qu'un terme de la description, lui-même plus qu'un mot prononcé
+FIELD_WEIGHTS = {'title': 3.0, 'description': 1.5, 'transcript': 1.0}
+# Part minimale des concurrents qui emploient un terme pour qu'il soit retenu (et au moins 2 vidéos)
+MIN_SHARE = 0.1
+DEFAULT_TOP_N = 30
+# Clé d'un bigramme : (id du premier mot + 1) << 31 | id du second ; un unigramme garde son id
+_BIGRAM_SHIFT = 31
+_WORD_MASK = (1 << _BIGRAM_SHIFT) - 1
+
+_WORD = re.compile(r"[^\W\d_]{3,}")
+
+
+def _numpy():
+    # Comme pour le résumé : NumPy n'est chargé qu'à la première analyse
+    import numpy
+    return numpy
+
+
+class CsrMatrix(NamedTuple):
+    """Matrice creuse documents x termes (même disposition que scipy.sparse.csr_matrix)."""
+    data: "numpy.ndarray"
+    indices: "numpy.ndarray"
+    indptr: "numpy.ndarray"
+    shape: tuple
+
+
+class Vocabulary:
+    """Mots rencontrés et leurs identifiants ; les mots vides occupent les premiers identifiants."""
+
+    def __init__(self):
+        self.words: List[str] = sorted(STOPWORDS)
+        self.ids: Dict[str, int] = {word: i for i, word in enumerate(self.words)}
+        self.stop_count = len(self.words)
+
+    def encode(self, text: str) -> "numpy.ndarray":
+        """Clés des unigrammes et bigrammes du texte (sans mot vide)."""
+        np = _numpy()
+        words = _WORD.findall(text.lower())
+        # Les nouveaux mots d'abord, puis une seule traduction mots -> identifiants (boucle en C)
+        for word in set(words).difference(self.ids):
+            self.ids[word] = len(self.words)
+            self.words.append(word)
+        ids = np.fromiter(map(self.ids.__getitem__, words), dtype=np.int64, count=len(words))
+        keep = ids >= self.stop_count
+        pairs = keep[:-1] & keep[1:]
+        bigrams = ((ids[:-1][pairs] + 1) << _BIGRAM_SHIFT) | ids[1:][pairs]
+        return np.concatenate([ids[keep], bigrams])
+
+    def decode(self, key: int) -> str:
+        if key <= _WORD_MASK:
+            return self.words[key]
+        return f"{self.words[(key >> _BIGRAM_SHIFT) - 1]} {self.words[key & _WORD_MASK]}"
+
+
+def build_matrix(documents: List[dict], vocabulary: Vocabulary):
+    """
+    Matrice TF-IDF (documents x termes) normalisée L2, pondérée par champ.
+    Retourne (matrice CSR, clés des termes, nombre de titres contenant chaque terme).
+    """
+    np = _numpy()
+    keys, docs, weights, in_title = [], [], [], []
+    for index, document in enumerate(documents):
+        for field, weight in FIELD_WEIGHTS.items():
+            field_keys = vocabulary.encode(document.get(field) or "")
+            keys.append(field_keys)
+            docs.append(np.full(len(field_keys), index, dtype=np.int64))
+            weights.append(np.full(len(field_keys), weight))
+            in_title.append(np.full(len(field_keys), field == 'title'))
+    keys, docs = np.concatenate(keys), np.concatenate(docs)
+    weights, in_title = np.concatenate(weights), np.concatenate(in_title)
+
+    term_keys, terms = np.unique(keys, return_inverse=True)
+    n_docs, n_terms = len(documents), len(term_keys)
+    # Occurrences pondérées par (document, terme), triées par document : directement au format CSR
+    cells, cell_index = np.unique(docs * n_terms + terms, return_inverse=True)
+    counts = np.bincount(cell_index, weights=weights)
+    rows, cols = cells // n_terms, cells % n_terms
+
+    df = np.bincount(cols, minlength=n_terms)
+    idf = np.log((1 + n_docs) / (1 + df)) + 1
+    data = (1 + np.log(counts)) * idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=n_docs))
+    data /= norms[rows]
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n_docs))])
+
+    title_cells = np.bincount(cell_index, weights=in_title, minlength=len(cells)) > 0
+    title_df = np.bincount(cols[title_cells], minlength=n_terms)
+    return CsrMatrix(data, cols, indptr, (n_docs, n_terms)), term_keys, title_df
+
+
+def keyword_gap(competitors: List[dict], own: dict, top_n: int = DEFAULT_TOP_N,
+                min_share: float = MIN_SHARE) -> List[dict]:
+    """
+    Termes employés par une part notable des vidéos concurrentes et absents de la nôtre,
+    classés par poids TF-IDF moyen. Chaque document est un dict 'title', 'description', 'transcript'.
+    """
+    if not competitors:
+        return []
+    np = _numpy()
+    vocabulary = Vocabulary()
+    matrix, term_keys, title_df = build_matrix(competitors, vocabulary)
+    n_docs = matrix.shape[0]
+
+    df = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    score = np.bincount(matrix.indices, weights=matrix.data, minlength=matrix.shape[1]) / n_docs
+    own_keys = np.unique(np.concatenate([vocabulary.encode(own.get(field) or "") for field in FIELD_WEIGHTS]))
+    eligible = (df >= max(2, min_share * n_docs)) & ~np.isin(term_keys, own_keys)
+
+    candidates = np.flatnonzero(eligible)
+    best = candidates[np.argsort(-score[candidates], kind="stable")[:top_n]]
+    return [
+        {
+            'term': vocabulary.decode(int(term_keys[term])),
+            'videos': int(df[term]),
+            'share': float(df[term] / n_docs),
+            'in_titles': int(title_df[term]),
+            'score': float(score[term]),
+        }
+        for term in best
+    ]
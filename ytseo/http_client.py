@@ -0,0 +1,163 @@
+"""
+Client HTTP partagé par tous les appels réseau : une session requests avec un pool
+de connexions keep-alive par hôte, compression gzip, délai d'expiration par défaut,
+reprises avec backoff exponentiel (et jitter) sur erreurs réseau, 429 et 5xx
+en respectant l'en-tête Retry-After, et mesure de la latence par hôte.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ytseo import metrics
+
+# (connexion, lecture) en secondes ; la lecture est large pour les réponses du modèle
+DEFAULT_TIMEOUT = (5, 120)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+
+class HostStats:
+    """Compteurs de latence pour un hôte."""
+
+    __slots__ = ("requests", "errors", "retries", "total_seconds", "max_seconds")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'avg_ms': 1000 * self.total_seconds / self.requests if self.requests else 0.0,
+            'max_ms': 1000 * self.max_seconds,
+        }
+
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Délai demandé par le serveur (secondes ou date HTTP), si présent."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _response_bytes(response: requests.Response, stream) -> int:
+    """Taille du corps : lu en entier sans `stream`, sinon Content-Length quand il est annoncé."""
+    if not stream:
+        return len(response.content)
+    try:
+        return int(response.headers.get("Content-Length", 0))
+    except ValueError:
+        return 0
+
+
+class HttpClient:
+    def __init__(self, pool_maxsize: int = 32, max_retries: int = MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE, backoff_max: float = BACKOFF_MAX, timeout=DEFAULT_TIMEOUT):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.session = requests.Session()
+        # urllib3 garde un pool par hôte ; pool_maxsize borne les connexions ouvertes vers chacun
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+        self._stats: Dict[str, HostStats] = {}
+        self._lock = threading.Lock()
+
+    def _host_stats(self, url: str) -> HostStats:
+        host = urlsplit(url).netloc
+        with self._lock:
+            stats = self._stats.get(host)
+            if stats is None:
+                stats = self._stats[host] = HostStats()
+            return stats
+
+    def _backoff(self, attempt: int) -> float:
+        # Backoff exponentiel avec « full jitter »
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        stats = self._host_stats(url)
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    stats.requests += 1
+                    stats.errors += 1
+                    stats.total_seconds += elapsed
+                    stats.max_seconds = max(stats.max_seconds, elapsed)
+                metrics.inc("http_requests_total", host=host, status="network_error")
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    stats.requests += 1
+                    stats.total_seconds += elapsed
+                    stats.max_seconds = max(stats.max_seconds, elapsed)
+                    if response.status_code >= 400:
+                        stats.errors += 1
+                metrics.inc("http_requests_total", host=host, status=str(response.status_code))
+                metrics.inc("http_response_bytes_total", _response_bytes(response, kwargs.get("stream")), host=host)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = retry_after_seconds(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                delay = min(delay, self.backoff_max)
+                response.close()
+            with self._lock:
+                stats.retries += 1
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def host_stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {host: stats.as_dict() for host, stats in self._stats.items()}
+
+
+client = HttpClient()
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return client.get(url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return client.post(url, **kwargs)
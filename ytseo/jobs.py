@@ -0,0 +1,187 @@
+"""
+Tâches de fond partagées par tout le processus : une analyse longue continue pendant que
+Streamlit relance le script, expose sa progression et ses résultats partiels, et peut être annulée.
+"""
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+DEFAULT_JOB_WORKERS = int(os.environ.get("SEO_YOUTUBE_JOB_WORKERS", "4"))
+# Les tâches terminées restent consultables une heure
+FINISHED_JOB_TTL = 3600
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED = "pending", "running", "done", "error", "cancelled"
+ACTIVE_STATES = (PENDING, RUNNING)
+
+
+class JobCancelled(Exception):
+    """Levée dans une tâche dont l'annulation a été demandée."""
+
+
+class Job:
+    """
+    État d'une tâche, mis à jour par la fonction exécutée (progression, résultats partiels)
+    et lu par les pages à chaque relance du script.
+    """
+
+    def __init__(self, key: Hashable, label: str = ""):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.label = label
+        self.status = PENDING
+        self.total: Optional[int] = None
+        self.completed = 0
+        self.stage = ""
+        self.error: Optional[str] = None
+        self.result: Any = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._results: List[Any] = []
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._future = None
+
+    # --- côté tâche ---
+
+    def set_stage(self, stage: str, total: Optional[int] = None):
+        with self._lock:
+            self.stage = stage
+            if total is not None:
+                self.total = total
+
+    def add_result(self, item: Any, done: bool = True) -> int:
+        """
+        Publie un résultat partiel et retourne sa position. `done=False` le publie sans avancer
+        la progression : il sera complété par update_result.
+        """
+        with self._lock:
+            self._results.append(item)
+            if done:
+                self.completed += 1
+            return len(self._results) - 1
+
+    def update_result(self, index: int, fields: dict, done: bool = False):
+        """Complète un résultat publié (remplacé par une copie : les lecteurs ne voient jamais d'état intermédiaire)."""
+        with self._lock:
+            self._results[index] = {**self._results[index], **fields}
+            if done:
+                self.completed += 1
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    # --- côté interface ---
+
+    def cancel(self):
+        """Demande l'arrêt ; une tâche pas encore démarrée est retirée de la file."""
+        self._cancel.set()
+        if self._future is not None and self._future.cancel():
+            self._finish(CANCELLED)
+
+    @property
+    def results(self) -> List[Any]:
+        with self._lock:
+            return list(self._results)
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE_STATES
+
+    @property
+    def progress(self) -> float:
+        """Avancement entre 0 et 1 (0 tant que le total n'est pas connu)."""
+        if self.status == DONE:
+            return 1.0
+        with self._lock:
+            return min(self.completed / self.total, 1.0) if self.total else 0.0
+
+    def _finish(self, status: str, error: Optional[str] = None):
+        with self._lock:
+            self.status = status
+            self.error = error
+            self.finished_at = time.time()
+
+
+class JobManager:
+    """
+    Pool de tâches unique pour le processus. Une tâche déjà en cours pour la même clé
+    est réutilisée plutôt que relancée : les relances de page ne consomment pas deux fois
+    le quota des API.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_JOB_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args, label: str = "", **kwargs) -> Job:
+        """Lance `fn(job, *args, **kwargs)` en arrière-plan, ou retourne la tâche active de même clé."""
+        with self._lock:
+            self._purge()
+            job = self._find_active(key)
+            if job is not None:
+                return job
+            job = Job(key, label)
+            self._jobs[job.id] = job
+            job._future = self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def find_active(self, key: Hashable) -> Optional[Job]:
+        with self._lock:
+            return self._find_active(key)
+
+    def _find_active(self, key: Hashable) -> Optional[Job]:
+        for job in self._jobs.values():
+            if job.key == key and job.active and not job.cancel_requested:
+                return job
+        return None
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id) if job_id else None
+
+    def active_jobs(self) -> List[Job]:
+        with self._lock:
+            return [job for job in self._jobs.values() if job.active]
+
+    @staticmethod
+    def _run(job: Job, fn: Callable[..., Any], args, kwargs):
+        if job.cancel_requested:
+            job._finish(CANCELLED)
+            return
+        job.status = RUNNING
+        try:
+            job.result = fn(job, *args, **kwargs)
+        except JobCancelled:
+            job._finish(CANCELLED)
+        except Exception as e:
+            job._finish(FAILED, f"{type(e).__name__}: {e}")
+        else:
+            job._finish(DONE)
+
+    def _purge(self):
+        limit = time.time() - FINISHED_JOB_TTL
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and job.finished_at < limit]:
+            del self._jobs[job_id]
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Gestionnaire partagé par toutes les sessions Streamlit du processus."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
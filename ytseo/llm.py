@@ -0,0 +1,348 @@
+"""Appels à l'API OpenAI (chat completions), cache des réponses et exécution concurrente bornée."""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+
+from ytseo import http_client, metrics
+from ytseo.cache import CACHE_DIR, ApiCache
+
+OPENAI_API_BASE = os.environ.get("OPENAI_API_BASE", "https://api.openai.com/v1")
+
+# Limites par défaut, ajustables par variables d'environnement
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("OPENAI_MAX_CONCURRENCY", "4"))
+DEFAULT_REQUESTS_PER_MINUTE = int(os.environ.get("OPENAI_RPM", "500"))
+DEFAULT_TOKENS_PER_MINUTE = int(os.environ.get("OPENAI_TPM", "200000"))
+
+# Une même requête au modèle est resservie depuis le cache pendant 30 jours
+LLM_CACHE_TTL = 30 * 24 * 3600
+
+T = TypeVar("T")
+
+
+class OpenAIAuthError(Exception):
+    """La clé API OpenAI a été refusée (HTTP 401)."""
+
+
+class IncompleteResponseError(Exception):
+    """Réponse refusée par le modèle ou interrompue (limite de tokens, filtre) : jamais mise en cache."""
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Estimation grossière du nombre de tokens (~4 caractères par token)."""
+    return sum(len(text) for text in texts) // 4 + 1
+
+
+class RateLimiter:
+    """
+    Limiteur sur fenêtre glissante d'une minute, en requêtes et en tokens.
+    Une limite à 0 désactive le contrôle correspondant.
+    """
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0, window: float = 60.0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window = window
+        self._events = deque()  # (horodatage, tokens)
+        self._tokens_in_window = 0
+        self._cond = threading.Condition()
+
+    def _purge(self, now: float):
+        while self._events and now - self._events[0][0] >= self.window:
+            _, tokens = self._events.popleft()
+            self._tokens_in_window -= tokens
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        if self.requests_per_minute and len(self._events) >= self.requests_per_minute:
+            return self._events[0][0] + self.window - now
+        if (self.tokens_per_minute and self._events
+                and self._tokens_in_window + tokens > self.tokens_per_minute):
+            return self._events[0][0] + self.window - now
+        return 0.0
+
+    def acquire(self, tokens: int = 0):
+        """Bloque jusqu'à ce que la requête puisse partir sans dépasser les limites."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._purge(now)
+                delay = self._wait_time(tokens, now)
+                if delay <= 0:
+                    self._events.append((now, tokens))
+                    self._tokens_in_window += tokens
+                    return
+                self._cond.wait(delay)
+
+
+class LLMExecutor:
+    """
+    Pool de threads borné pour les appels au modèle.
+    Les résultats sont toujours rendus dans l'ordre des tâches soumises.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_CONCURRENCY):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+
+    def submit(self, task: Callable[[], T]) -> Future:
+        return self._pool.submit(_run_as_worker, task)
+
+    def run(self, tasks: Iterable[Callable[[], T]]) -> List[T]:
+        """
+        Exécute les tâches en parallèle et retourne leurs résultats dans l'ordre.
+        La première exception rencontrée (dans l'ordre des tâches) est relevée.
+        Appelé depuis un thread du pool, exécute les tâches sur place pour éviter
+        qu'un pool saturé n'attende ses propres sous-tâches.
+        """
+        if getattr(_worker_state, 'active', False):
+            return [task() for task in tasks]
+        futures = [self.submit(task) for task in tasks]
+        return [future.result() for future in futures]
+
+
+_worker_state = threading.local()
+
+
+def _run_as_worker(task: Callable[[], T]) -> T:
+    _worker_state.active = True
+    try:
+        return task()
+    finally:
+        _worker_state.active = False
+
+
+_rate_limiter = RateLimiter(DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_TOKENS_PER_MINUTE)
+_executor: Optional[LLMExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> LLMExecutor:
+    """Pool partagé par tout le processus (toutes les sessions Streamlit)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = LLMExecutor(DEFAULT_MAX_CONCURRENCY)
+        return _executor
+
+
+def configure(max_concurrency: Optional[int] = None, requests_per_minute: Optional[int] = None,
+              tokens_per_minute: Optional[int] = None):
+    """Modifie les limites du pool et du limiteur partagés."""
+    global _executor
+    with _executor_lock:
+        if max_concurrency is not None and (_executor is None or _executor.max_workers != max_concurrency):
+            previous, _executor = _executor, LLMExecutor(max_concurrency)
+            if previous is not None:
+                previous._pool.shutdown(wait=False)
+    if requests_per_minute is not None:
+        _rate_limiter.requests_per_minute = requests_per_minute
+    if tokens_per_minute is not None:
+        _rate_limiter.tokens_per_minute = tokens_per_minute
+
+
+class LLMCache:
+    """
+    Cache des réponses du modèle, adressé par le contenu de la requête.
+    LRU en mémoire devant un stockage SQLite partagé entre processus.
+    Chaque entrée garde les tokens consommés et la durée de l'appel d'origine,
+    ce qui permet de chiffrer ce que le cache a fait économiser.
+    """
+
+    def __init__(self, path: str, memory_entries: int = 512, max_entries: int = 20_000):
+        self.memory_entries = memory_entries
+        self._disk = ApiCache(path, max_entries=max_entries)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self.seconds_saved = 0.0
+
+    @staticmethod
+    def make_key(model: str, system: str, prompt: str, temperature: float, max_tokens: int,
+                 response_format: Optional[dict] = None) -> str:
+        fields = [model, system, prompt, temperature, max_tokens]
+        if response_format is not None:
+            fields.append(response_format)
+        payload = json.dumps(fields, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is None:
+            entry = self._disk.get(key)
+            if entry is not None:
+                self._remember(key, entry)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.tokens_saved += entry.get('tokens', 0)
+                self.seconds_saved += entry.get('seconds', 0.0)
+        return entry
+
+    def put(self, key: str, content: str, tokens: int, seconds: float):
+        entry = {'content': content, 'tokens': tokens, 'seconds': seconds}
+        self._remember(key, entry)
+        self._disk.set(key, entry, LLM_CACHE_TTL)
+
+    def _remember(self, key: str, entry: dict):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'tokens_saved': self.tokens_saved,
+                'seconds_saved': self.seconds_saved,
+            }
+
+
+_llm_cache: Optional[LLMCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Cache partagé par tout le processus, stocké dans CACHE_DIR/llm_cache.sqlite."""
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMCache(os.path.join(CACHE_DIR, "llm_cache.sqlite"))
+        return _llm_cache
+
+
+def _chat_request(prompt, systeme, secret_key, temperature, model, max_tokens, stream=False, response_format=None):
+    """Envoie la requête chat/completions après passage par le limiteur de débit."""
+    url = f"{OPENAI_API_BASE}/chat/completions"
+
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": systeme},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": temperature,
+        "max_tokens": max_tokens
+    }
+    if response_format is not None:
+        payload["response_format"] = response_format
+    if stream:
+        payload["stream"] = True
+        payload["stream_options"] = {"include_usage": True}
+
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {secret_key}"
+    }
+
+    _rate_limiter.acquire(estimate_tokens(prompt, systeme) + max_tokens)
+    response = http_client.post(url, headers=headers, json=payload, stream=stream)
+    if response.status_code == 401:
+        raise OpenAIAuthError("Unauthorized access to OpenAI API. Please check your API key.")
+    response.raise_for_status()
+    return response
+
+
+def _check_complete(content: Optional[str], finish_reason: Optional[str], refusal: Optional[str] = None):
+    """Relève IncompleteResponseError si la réponse ne doit être ni utilisée ni mise en cache."""
+    if refusal or content is None:
+        raise IncompleteResponseError(f"Le modèle a refusé de répondre : {refusal or 'réponse vide'}")
+    if finish_reason != "stop":
+        raise IncompleteResponseError(f"Réponse du modèle incomplète (finish_reason : {finish_reason}).")
+
+
+def _record_usage(usage: dict, model: str) -> int:
+    """Alimente les compteurs de tokens et retourne le total facturé."""
+    metrics.inc("llm_tokens_total", usage.get("prompt_tokens", 0), model=model, kind="prompt")
+    metrics.inc("llm_tokens_total", usage.get("completion_tokens", 0), model=model, kind="completion")
+    return usage.get("total_tokens", 0)
+
+
+@metrics.timed("GPT35")
+def GPT35(prompt, systeme, secret_key, temperature=0.7, model="gpt-4o-mini", max_tokens=1200, regenerate=False,
+          response_format=None):
+    """
+    Appelle le modèle, ou resservit la réponse déjà obtenue pour exactement la même requête.
+    `regenerate=True` ignore le cache (la nouvelle réponse le remplace).
+    `response_format` est transmis tel quel (ex. sortie structurée par schéma JSON).
+    Une réponse refusée ou tronquée relève IncompleteResponseError et n'est pas mise en cache.
+    """
+    cache = get_llm_cache()
+    cache_key = LLMCache.make_key(model, systeme, prompt, temperature, max_tokens, response_format)
+    if not regenerate:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            metrics.inc("llm_cache_hits_total", model=model)
+            return cached['content']
+
+    start = time.perf_counter()
+    data = _chat_request(prompt, systeme, secret_key, temperature, model, max_tokens,
+                         response_format=response_format).json()
+    choice = data["choices"][0]
+    tokens = _record_usage(data.get("usage") or {}, model)
+    content = choice["message"].get("content")
+    _check_complete(content, choice.get("finish_reason"), choice["message"].get("refusal"))
+    cache.put(cache_key, content, tokens, time.perf_counter() - start)
+    return content
+
+
+@metrics.timed("GPT35_stream")
+def GPT35_stream(prompt, systeme, secret_key, temperature=0.7, model="gpt-4o-mini", max_tokens=1200,
+                 regenerate=False, response_format=None) -> Iterator[str]:
+    """
+    Variante de GPT35 qui produit la réponse morceau par morceau (flux SSE).
+    Une réponse en cache est produite d'un seul bloc ; seule une réponse complète (finish_reason
+    « stop ») est mise en cache, sinon IncompleteResponseError est relevée en fin de flux.
+    """
+    cache = get_llm_cache()
+    cache_key = LLMCache.make_key(model, systeme, prompt, temperature, max_tokens, response_format)
+    if not regenerate:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            metrics.inc("llm_cache_hits_total", model=model)
+            yield cached['content']
+            return
+
+    start = time.perf_counter()
+    response = _chat_request(prompt, systeme, secret_key, temperature, model, max_tokens, stream=True,
+                             response_format=response_format)
+    parts = []
+    refusal = []
+    tokens = 0
+    finished = False
+    finish_reason = None
+    with response:
+        for line in response.iter_lines(chunk_size=None):
+            if not line.startswith(b"data:"):
+                continue
+            data = line[len(b"data:"):].strip()
+            if data == b"[DONE]":
+                finished = True
+                break
+            event = json.loads(data)
+            if event.get("usage"):
+                tokens = _record_usage(event["usage"], model)
+            for choice in event.get("choices", []):
+                delta = choice.get("delta", {})
+                if delta.get("content"):
+                    parts.append(delta["content"])
+                    yield delta["content"]
+                if delta.get("refusal"):
+                    refusal.append(delta["refusal"])
+                finish_reason = choice.get("finish_reason") or finish_reason
+    # Flux coupé avant [DONE], refus ou limite atteinte : rien n'est mis en cache
+    _check_complete("".join(parts), finish_reason if finished else None, "".join(refusal))
+    cache.put(cache_key, "".join(parts), tokens, time.perf_counter() - start)
@@ -0,0 +1,215 @@
+"""
+Instrumentation légère, active en permanence : durées des étapes (spans) en histogrammes,
+compteurs (appels HTTP, octets, tokens) et export au format texte Prometheus.
+Une mesure coûte un perf_counter et une mise à jour sous verrou.
+"""
+import functools
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+# Bornes des histogrammes de durée (secondes)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PREFIX = "seo_youtube_"
+METRICS_PORT = os.environ.get("SEO_YOUTUBE_METRICS_PORT")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, fraction: float) -> float:
+        """Estimation par la borne supérieure du seau atteint."""
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), self.counts):
+            seen += count
+            if seen >= target and count:
+                return bound
+        return 0.0
+
+
+class Registry:
+    def __init__(self):
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def describe(self, name: str, text: str):
+        self._help[name] = text
+
+    def counters(self) -> Dict[Tuple[str, Labels], float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def spans(self) -> Dict[str, dict]:
+        """Résumé par étape : appels, durée moyenne, p95 estimé, total."""
+        with self._lock:
+            return {
+                dict(labels)['span']: {
+                    'count': histogram.count,
+                    'avg_s': histogram.total / histogram.count if histogram.count else 0.0,
+                    'p95_s': histogram.quantile(0.95),
+                    'total_s': histogram.total,
+                }
+                for (name, labels), histogram in self._histograms.items() if name == "span_seconds"
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def export_prometheus(self) -> str:
+        """Toutes les métriques au format texte d'exposition Prometheus."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(((key, (list(h.counts), h.total, h.count)) for key, h in self._histograms.items()))
+        lines = []
+        declared = set()
+
+        def declare(name: str, kind: str):
+            if name not in declared:
+                declared.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {PREFIX}{name} {self._help[name]}")
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+        for (name, labels), value in counters:
+            declare(name, "counter")
+            lines.append(f"{PREFIX}{name}{_format_labels(labels)} {value:g}")
+        for (name, labels), (counts, total, count) in histograms:
+            declare(name, "histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {total:.6f}")
+            lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (k + '="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+               for k, v in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+registry = Registry()
+registry.describe("span_seconds", "Durée des étapes instrumentées")
+registry.describe("span_errors_total", "Étapes terminées par une exception")
+registry.describe("http_requests_total", "Requêtes HTTP envoyées (reprises comprises)")
+registry.describe("http_response_bytes_total", "Octets reçus dans les corps de réponse")
+registry.describe("llm_tokens_total", "Tokens facturés par le modèle")
+registry.describe("llm_cache_hits_total", "Réponses du modèle resservies depuis le cache")
+registry.describe("suggest_index_lookups_total", "Recherches dans l'index local des suggestions (hit, miss, stale)")
+
+
+def inc(name: str, value: float = 1, **labels):
+    registry.inc(name, value, **labels)
+
+
+@contextmanager
+def span(name: str):
+    """Mesure la durée du bloc dans l'histogramme span_seconds{span=name}."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        registry.inc("span_errors_total", span=name)
+        raise
+    finally:
+        registry.observe("span_seconds", time.perf_counter() - start, span=name)
+
+
+def timed(name: Optional[str] = None):
+    """Décorateur : span autour de la fonction (jusqu'à épuisement pour un générateur)."""
+    def decorate(func):
+        span_name = name or func.__name__
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                with span(span_name):
+                    yield from func(*args, **kwargs)
+            return generator_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def export_prometheus() -> str:
+    return registry.export_prometheus()
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_http_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Expose /metrics sur `port` (une seule fois par processus)."""
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                payload = export_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        _server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=_server.serve_forever, daemon=True, name="metrics").start()
+        return _server
+
+
+def start_from_environment():
+    """Démarre l'export si SEO_YOUTUBE_METRICS_PORT est défini."""
+    if METRICS_PORT:
+        start_http_server(int(METRICS_PORT))
@@ -0,0 +1,255 @@
+"""
+Enchaînements complets (métadonnées, transcription, génération) partagés par les pages
+Streamlit et le traitement par lots, sans dépendance à l'interface.
+"""
+import os
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+from functools import partial
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from ytseo import gap, llm, metrics, seo, summarize, transcripts, youtube
+from ytseo.jobs import Job
+
+# Transcriptions téléchargées en parallèle pendant les générations
+TRANSCRIPT_WORKERS = int(os.environ.get("SEO_YOUTUBE_TRANSCRIPT_WORKERS", "4"))
+
+_transcript_pool: Optional[ThreadPoolExecutor] = None
+_transcript_pool_lock = threading.Lock()
+_PRODUCER_DONE = object()
+
+
+def video_transcript_text(video_id: str, language: str = 'fr', fallback_languages=('en',)) -> dict:
+    """Meilleure transcription disponible, en texte brut ('' si aucune), avec son nombre de mots."""
+    best = transcripts.resolve_transcript(video_id, language, fallback_languages)
+    if best is None:
+        return {'text': "", 'language': None, 'words': 0}
+    segments = best['transcript']
+    return {'text': segments.text, 'language': best['language'], 'words': segments.word_count}
+
+
+@metrics.timed("optimize_video")
+def optimize_video(youtube_api_key: str, openai_api_key: str, video_url: str, language: str = 'fr',
+                   regenerate: bool = False) -> dict:
+    """Métadonnées de la vidéo, transcription condensée, puis titre, description et hashtags optimisés."""
+    details = youtube.get_video_details(youtube_api_key, video_url)
+    transcript = video_transcript_text(details['video_id'], language)
+    metadata = seo.generate_optimized_metadata(openai_api_key, details['title'], details['description'],
+                                               summarize.condense(transcript['text']), regenerate)
+    return {
+        **details,
+        'transcript_language': transcript['language'],
+        'transcript_words': transcript['words'],
+        'optimized_title': metadata['title'],
+        'optimized_description': metadata['description'],
+        'hashtags': metadata['hashtags'],
+        'invalid_fields': metadata['invalid_fields'],
+    }
+
+
+def transcript_digest(video_id: str, language: str = 'fr') -> Optional[dict]:
+    """Meilleure transcription réduite à l'affichage : langue, type, statistiques et extraits (None si aucune)."""
+    best = transcripts.resolve_transcript(video_id, language)
+    if best is None or not best['transcript']:
+        return None
+    segments = best['transcript']
+    return {
+        'language': best['language'],
+        'type': best['type'],
+        'words': segments.word_count,
+        'chars': segments.char_count,
+        'duration': segments.end,
+        'summary': summarize.condense(segments.text),
+    }
+
+
+def _transcript_text(video_id: str, language: str) -> str:
+    """Texte intégral de la transcription retenue pour la vidéo ('' si aucune ou en cas d'erreur)."""
+    try:
+        best = transcripts.resolve_transcript(video_id, language)
+    except Exception:
+        return ""
+    return best['transcript'].text if best is not None else ""
+
+
+def _gap_document(title: str, description: str, video_id: str, language: str) -> dict:
+    return {'title': title, 'description': description, 'transcript': _transcript_text(video_id, language)}
+
+
+@metrics.timed("keyword_gap")
+def keyword_gap(own_details: dict, competitors: List[dict], language: str = 'fr',
+                top_n: int = gap.DEFAULT_TOP_N) -> List[dict]:
+    """
+    Termes que les vidéos concurrentes (lignes de optimize_top_videos) partagent et que la nôtre
+    (youtube.get_video_details) n'emploie pas. Les transcriptions déjà récupérées par l'analyse
+    sont relues depuis le stockage local.
+    """
+    pool = _get_transcript_pool()
+    own = pool.submit(_gap_document, own_details['title'], own_details['description'],
+                      own_details['video_id'], language)
+    documents = list(pool.map(
+        lambda video: _gap_document(video['original_title'], video['original_description'],
+                                    youtube.extract_video_id(video['url']), language),
+        competitors,
+    ))
+    return gap.keyword_gap(documents, own.result(), top_n)
+
+
+def _get_transcript_pool() -> ThreadPoolExecutor:
+    global _transcript_pool
+    with _transcript_pool_lock:
+        if _transcript_pool is None:
+            _transcript_pool = ThreadPoolExecutor(max_workers=TRANSCRIPT_WORKERS, thread_name_prefix="transcript")
+        return _transcript_pool
+
+
+def stream_top_videos(youtube_api_key: str, query: str, language: str, openai_api_key: str,
+                      max_results: int = 5, regenerate: bool = False, with_transcripts: bool = False,
+                      max_units: Optional[int] = None) -> Iterator[Tuple[int, dict, bool]]:
+    """
+    Meilleures vidéos pour un mot-clé, en flux : produit (rang, champs, terminée) à chaque étape
+    aboutie, dans l'ordre d'achèvement. Étapes : recherche paginée (au plus `max_units` unités
+    de quota) → videos.list (la ligne de la vidéo) → génération structurée et, avec
+    `with_transcripts`, transcription, en parallèle.
+    Une génération ou une transcription en échec est signalée dans la ligne de la vidéo
+    ('optimization_error', 'transcript_error') ; seule une clé OpenAI refusée interrompt le flux.
+    """
+    events = queue.Queue()
+    stop = threading.Event()
+    futures = []
+    stages = 2 if with_transcripts else 1
+    executor = llm.get_executor()
+
+    def watch(rank: int, future: Future, to_fields: Callable[[Any], dict]):
+        def on_done(done: Future):
+            if not done.cancelled():
+                events.put((rank, done, to_fields))
+
+        futures.append(future)
+        future.add_done_callback(on_done)
+
+    def produce():
+        rank = 0
+        try:
+            for video_ids in youtube.iter_search_pages(youtube_api_key, query, language, max_results, max_units):
+                if stop.is_set():
+                    return
+                # Une seule requête videos.list par page (50 identifiants) au lieu d'une par vidéo
+                videos_data = youtube.fetch_videos(youtube_api_key, video_ids)
+                for video_id in video_ids:
+                    if stop.is_set():
+                        return
+                    if video_id not in videos_data:
+                        continue
+                    video_data = videos_data[video_id]
+                    rank += 1
+                    events.put((rank, None, _video_row(rank, video_id, video_data)))
+                    watch(rank, executor.submit(partial(
+                        seo.generate_optimized_metadata, openai_api_key, video_data['snippet']['title'],
+                        video_data['snippet']['description'], "", regenerate)), _metadata_fields)
+                    if with_transcripts:
+                        watch(rank, _get_transcript_pool().submit(transcript_digest, video_id, language),
+                              lambda digest: {'transcript': digest})
+        except BaseException as e:
+            events.put(e)
+        finally:
+            events.put(_PRODUCER_DONE)
+
+    threading.Thread(target=produce, daemon=True, name="top-videos").start()
+    remaining = {}
+    producing = True
+    try:
+        while producing or remaining:
+            event = events.get()
+            if event is _PRODUCER_DONE:
+                producing = False
+                continue
+            if isinstance(event, BaseException):
+                raise event
+            # Ligne d'une nouvelle vidéo (future None) ou étape terminée et sa conversion en champs
+            rank, future, payload = event
+            if future is None:
+                remaining[rank] = stages
+                yield rank, payload, False
+                continue
+            try:
+                fields = payload(future.result())
+            except llm.OpenAIAuthError:
+                # Clé refusée : toutes les générations suivantes échoueraient de la même façon
+                raise
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                if payload is _metadata_fields:
+                    fields = {'optimized_title': None, 'optimized_description': None, 'optimization_error': error}
+                else:
+                    fields = {'transcript': None, 'transcript_error': error}
+            remaining[rank] -= 1
+            done = remaining[rank] == 0
+            if done:
+                del remaining[rank]
+            yield rank, fields, done
+    finally:
+        # Annulation ou erreur : la pagination s'arrête et les étapes pas encore démarrées ne partent pas
+        stop.set()
+        for future in futures:
+            future.cancel()
+
+
+@metrics.timed("get_top_videos")
+def optimize_top_videos(youtube_api_key: str, query: str, language: str, openai_api_key: str,
+                        max_results: int = 5, regenerate: bool = False, job: Optional[Job] = None,
+                        with_transcripts: bool = False, max_units: Optional[int] = None) -> List[dict]:
+    """
+    Meilleures vidéos pour un mot-clé, avec titre et description optimisés pour chacune.
+    La pagination ne dépasse pas `max_units` unités de quota (par défaut, l'estimation
+    de youtube.estimate_top_videos_cost faite au lancement).
+    Avec `job`, chaque vidéo est publiée dès que sa ligne est connue puis complétée étape par
+    étape, dans l'ordre d'achèvement, et l'annulation est vérifiée entre deux étapes.
+    """
+    if max_units is None:
+        max_units = youtube.estimate_top_videos_cost(query, language, max_results)
+    if job is not None:
+        job.set_stage("Recherche des vidéos", total=max_results)
+    records = {}
+    positions = {}
+    with closing(stream_top_videos(youtube_api_key, query, language, openai_api_key, max_results,
+                                   regenerate, with_transcripts, max_units)) as updates:
+        for rank, fields, done in updates:
+            if job is not None:
+                job.check_cancelled()
+            if rank not in records:
+                records[rank] = dict(fields)
+                if job is not None:
+                    job.set_stage("Optimisation des titres et descriptions")
+                    positions[rank] = job.add_result(fields, done)
+            else:
+                records[rank].update(fields)
+                if job is not None:
+                    job.update_result(positions[rank], fields, done)
+    if job is not None:
+        job.set_stage("Terminé", total=len(records))
+    return [records[rank] for rank in sorted(records)]
+
+
+def _video_row(rank: int, video_id: str, video_data: dict) -> dict:
+    return {
+        'rank': rank,
+        'original_title': video_data['snippet']['title'],
+        'original_description': video_data['snippet']['description'],
+        'views': int(video_data['statistics'].get('viewCount', 0)),
+        'length': video_data['contentDetails']['duration'],
+        'published_at': video_data['snippet']['publishedAt'],
+        'comments': int(video_data['statistics'].get('commentCount', 0)),
+        'url': f"https://www.youtube.com/watch?v={video_id}",
+        'category': video_data['snippet'].get('categoryId', 'N/A'),  # Category ID
+        'channel_title': video_data['snippet']['channelTitle']
+    }
+
+
+def _metadata_fields(metadata: dict) -> dict:
+    return {
+        'optimized_title': metadata['title'],
+        'optimized_description': seo.format_description(metadata),
+    }
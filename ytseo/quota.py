@@ -0,0 +1,152 @@
+"""
+Suivi du quota de l'API YouTube Data v3 : chaque appel est inscrit (unités, par clé API et
+par jour) dans un registre SQLite local, et refusé avant que le budget quotidien ne soit dépassé.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from ytseo.cache import CACHE_DIR
+
+# Coût en unités de chaque méthode (https://developers.google.com/youtube/v3/determine_quota_cost)
+COSTS = {
+    'search': 100,
+    'videos': 1,
+    'videoCategories': 1,
+    'channels': 1,
+    'captions': 50,
+}
+DAILY_BUDGET = int(os.environ.get("YOUTUBE_DAILY_QUOTA", "10000"))
+# En dessous de cette part du budget, les stratégies économes sont privilégiées
+LOW_QUOTA_RATIO = 0.2
+
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+except Exception:
+    # Sans base de fuseaux horaires : heure du Pacifique sans changement d'heure
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8))
+
+
+class QuotaExceeded(Exception):
+    """L'appel dépasserait le budget quotidien de la clé API."""
+
+
+def quota_day(now: Optional[datetime] = None) -> str:
+    """Le quota YouTube est remis à zéro à minuit, heure du Pacifique."""
+    return (now or datetime.now(timezone.utc)).astimezone(QUOTA_TIMEZONE).strftime("%Y-%m-%d")
+
+
+def key_id(api_key: str) -> str:
+    """Empreinte de la clé : le registre ne contient jamais la clé elle-même."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class QuotaLedger:
+    """Registre des unités consommées par (clé, jour, méthode), partagé entre processus."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS usage ("
+            " key_id TEXT NOT NULL, day TEXT NOT NULL, endpoint TEXT NOT NULL,"
+            " calls INTEGER NOT NULL, units INTEGER NOT NULL,"
+            " PRIMARY KEY (key_id, day, endpoint))"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            if self.path != ":memory:":
+                connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def used(self, api_key: str, day: Optional[str] = None) -> int:
+        (units,) = self._connection().execute(
+            "SELECT COALESCE(SUM(units), 0) FROM usage WHERE key_id = ? AND day = ?",
+            (key_id(api_key), day or quota_day()),
+        ).fetchone()
+        return units
+
+    def breakdown(self, api_key: str, day: Optional[str] = None) -> Dict[str, dict]:
+        rows = self._connection().execute(
+            "SELECT endpoint, calls, units FROM usage WHERE key_id = ? AND day = ?",
+            (key_id(api_key), day or quota_day()),
+        )
+        return {endpoint: {'calls': calls, 'units': units} for endpoint, calls, units in rows}
+
+    def record(self, api_key: str, endpoint: str, units: int, limit: Optional[int] = None, calls: int = 1) -> int:
+        """
+        Inscrit la consommation et retourne le total du jour. Avec `limit`, la vérification
+        et l'inscription sont atomiques (entre threads comme entre processus).
+        """
+        connection = self._connection()
+        identity, day = key_id(api_key), quota_day()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            (used,) = connection.execute(
+                "SELECT COALESCE(SUM(units), 0) FROM usage WHERE key_id = ? AND day = ?", (identity, day)
+            ).fetchone()
+            if limit is not None and used + units > limit:
+                raise QuotaExceeded(
+                    f"YouTube API quota: {endpoint} needs {units} units, "
+                    f"{max(limit - used, 0)} left today (budget {limit})"
+                )
+            connection.execute(
+                "INSERT INTO usage (key_id, day, endpoint, calls, units) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key_id, day, endpoint) DO UPDATE SET "
+                "calls = calls + excluded.calls, units = units + excluded.units",
+                (identity, day, endpoint, calls, units),
+            )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return used + units
+
+
+class QuotaPlanner:
+    """
+    Décide avant chaque appel : refus s'il dépasse le budget, et signale quand le reste
+    est assez bas pour préférer les stratégies économes (cache, lots regroupés).
+    """
+
+    def __init__(self, ledger: QuotaLedger, daily_budget: int = DAILY_BUDGET,
+                 low_quota_ratio: float = LOW_QUOTA_RATIO):
+        self.ledger = ledger
+        self.daily_budget = daily_budget
+        self.low_quota_ratio = low_quota_ratio
+
+    def remaining(self, api_key: str) -> int:
+        return max(self.daily_budget - self.ledger.used(api_key), 0)
+
+    def conserve(self, api_key: str) -> bool:
+        return self.remaining(api_key) < self.daily_budget * self.low_quota_ratio
+
+    def can_afford(self, api_key: str, units: int) -> bool:
+        return units <= self.remaining(api_key)
+
+    def charge(self, api_key: str, endpoint: str, calls: int = 1):
+        """À appeler juste avant la requête : lève QuotaExceeded plutôt que de dépasser le budget."""
+        self.ledger.record(api_key, endpoint, COSTS.get(endpoint, 1) * calls, self.daily_budget, calls)
+
+
+_planner: Optional[QuotaPlanner] = None
+_planner_lock = threading.Lock()
+
+
+def get_planner() -> QuotaPlanner:
+    """Planificateur partagé, registre stocké dans CACHE_DIR/quota.sqlite."""
+    global _planner
+    with _planner_lock:
+        if _planner is None:
+            _planner = QuotaPlanner(QuotaLedger(os.path.join(CACHE_DIR, "quota.sqlite")))
+        return _planner
@@ -0,0 +1,185 @@
+"""
+Représentation compacte d'une transcription : un seul texte, les bornes de chaque segment
+dans ce texte et des colonnes array('d') pour les débuts et durées, au lieu d'une liste de dicts.
+Les tranches (par index, par plage de temps ou de mots) partagent ces tampons sans les copier.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from typing import Iterable, List, Optional, Union
+
+
+class TranscriptSegments(Sequence):
+    """
+    Segments d'une transcription. Se lit comme l'ancienne liste de dicts
+    (`len`, itération, `segments[i]['text']`), avec en plus des statistiques en O(1)
+    (`word_count`, `char_count`, `end`) et des vues sans copie (`between`, `words`).
+    """
+
+    __slots__ = ("_text", "_char_start", "_char_end", "_word_start", "_start", "_duration",
+                 "_lo", "_hi", "_char_lo", "_char_hi", "_word_lo", "_word_hi")
+
+    def __init__(self, text: str, char_start: array, char_end: array, word_start: array,
+                 start: array, duration: array, bounds: Optional[tuple] = None):
+        self._text = text
+        self._char_start = char_start
+        self._char_end = char_end
+        # word_start a un élément de plus : nombre cumulé de mots avant chaque segment, puis le total
+        self._word_start = word_start
+        self._start = start
+        self._duration = duration
+        count = len(start)
+        self._lo, self._hi, self._char_lo, self._char_hi, self._word_lo, self._word_hi = bounds or (
+            0, count, 0, len(text), 0, word_start[count])
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[dict]) -> "TranscriptSegments":
+        """Construit le texte et les colonnes en un seul passage (espaces et retours à la ligne normalisés)."""
+        if isinstance(segments, TranscriptSegments):
+            return segments
+        parts = []
+        char_start, char_end = array('q'), array('q')
+        word_start = array('q', [0])
+        start, duration = array('d'), array('d')
+        position = words = 0
+        for segment in segments:
+            piece_words = segment['text'].split()
+            piece = " ".join(piece_words)
+            if piece and parts:
+                parts.append(" ")
+                position += 1
+            char_start.append(position)
+            parts.append(piece)
+            position += len(piece)
+            char_end.append(position)
+            words += len(piece_words)
+            word_start.append(words)
+            start.append(float(segment.get('start', 0.0)))
+            duration.append(float(segment.get('duration', 0.0)))
+        return cls("".join(parts), char_start, char_end, word_start, start, duration)
+
+    def _view(self, lo: int, hi: int, char_lo: Optional[int] = None, char_hi: Optional[int] = None,
+              word_lo: Optional[int] = None, word_hi: Optional[int] = None) -> "TranscriptSegments":
+        if hi <= lo:
+            position = self._char_start[lo] if lo < len(self._start) else self._char_hi
+            words = self._word_start[lo]
+            bounds = (lo, lo, position, position, words, words)
+        else:
+            # Les segments vides n'ont pas de texte (ni l'espace qui joint leurs voisins) :
+            # la tranche s'étend du premier au dernier segment non vide
+            first, last = lo, hi - 1
+            while first < last and self._char_start[first] == self._char_end[first]:
+                first += 1
+            while last > first and self._char_start[last] == self._char_end[last]:
+                last -= 1
+            bounds = (
+                lo, hi,
+                self._char_start[first] if char_lo is None else char_lo,
+                self._char_end[last] if char_hi is None else char_hi,
+                self._word_start[lo] if word_lo is None else word_lo,
+                self._word_start[hi] if word_hi is None else word_hi,
+            )
+        return TranscriptSegments(self._text, self._char_start, self._char_end, self._word_start,
+                                  self._start, self._duration, bounds)
+
+    # --- lecture comme une liste de segments ---
+
+    def __len__(self) -> int:
+        return self._hi - self._lo
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            lo, hi, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(lo, hi, step)]
+            return self._view(self._lo + lo, self._lo + max(hi, lo))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        i = self._lo + index
+        text = self._text[max(self._char_start[i], self._char_lo):min(self._char_end[i], self._char_hi)]
+        return {'text': text, 'start': self._start[i], 'duration': self._duration[i]}
+
+    def __bool__(self) -> bool:
+        return self._hi > self._lo
+
+    def __repr__(self) -> str:
+        return f"<TranscriptSegments {len(self)} segments, {self.word_count} mots, {self.end:.0f}s>"
+
+    # --- statistiques ---
+
+    @property
+    def text(self) -> str:
+        """Texte de la tranche (seule opération qui copie)."""
+        return self._text[self._char_lo:self._char_hi]
+
+    @property
+    def word_count(self) -> int:
+        return self._word_hi - self._word_lo
+
+    @property
+    def char_count(self) -> int:
+        return self._char_hi - self._char_lo
+
+    @property
+    def start(self) -> float:
+        return self._start[self._lo] if self else 0.0
+
+    @property
+    def end(self) -> float:
+        """Fin du dernier segment (pour la transcription entière : la durée de la vidéo)."""
+        return self._start[self._hi - 1] + self._duration[self._hi - 1] if self else 0.0
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    # --- tranches ---
+
+    def between(self, start: float, end: float) -> "TranscriptSegments":
+        """
+        Segments qui chevauchent [start, end) en secondes (débuts supposés croissants).
+
+        >>> segments = TranscriptSegments.from_segments([
+        ...     {'text': "hello  world", 'start': 0.0, 'duration': 2.0},
+        ...     {'text': "", 'start': 2.0, 'duration': 1.0},
+        ...     {'text': "foo bar baz", 'start': 3.0, 'duration': 2.0}])
+        >>> segments.between(2.5, 4).text, segments[1:3].text, segments[0:2].text, segments[1:2].text
+        ('foo bar baz', 'foo bar baz', 'hello world', '')
+        """
+        lo = max(bisect_right(self._start, start, self._lo, self._hi) - 1, self._lo)
+        if lo < self._hi and self._start[lo] + self._duration[lo] <= start:
+            lo += 1
+        hi = bisect_left(self._start, end, lo, self._hi)
+        return self._view(lo, hi)
+
+    def words(self, first: int, last: int) -> "TranscriptSegments":
+        """Mots d'indices [first, last) de la tranche, coupés au mot près dans les segments de bord."""
+        first = self._word_lo + max(first, 0)
+        last = min(self._word_lo + last, self._word_hi)
+        if last <= first:
+            return self._view(self._hi, self._hi)
+        # Segment contenant le mot `first` et segment contenant le mot `last - 1`
+        lo = bisect_right(self._word_start, first, self._lo, self._hi + 1) - 1
+        hi = bisect_right(self._word_start, last - 1, lo, self._hi + 1)
+        char_lo = self._word_begin(lo, first - self._word_start[lo])
+        char_hi = self._word_finish(hi - 1, last - self._word_start[hi - 1])
+        return self._view(lo, hi, max(char_lo, self._char_lo), min(char_hi, self._char_hi), first, last)
+
+    def _word_begin(self, index: int, word: int) -> int:
+        """Position dans le texte du début du mot n° `word` du segment (le texte est normalisé : un espace entre deux mots)."""
+        position = self._char_start[index]
+        for _ in range(word):
+            position = self._text.index(" ", position, self._char_end[index]) + 1
+        return position
+
+    def _word_finish(self, index: int, words: int) -> int:
+        """Position de la fin des `words` premiers mots du segment."""
+        space = self._text.find(" ", self._word_begin(index, words - 1), self._char_end[index])
+        return self._char_end[index] if space < 0 else space
+
+    def to_list(self) -> List[dict]:
+        """Liste de dicts {'text', 'start', 'duration'} (format de stockage et d'échange)."""
+        return [self[i] for i in range(len(self))]
+
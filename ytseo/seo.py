@@ -0,0 +1,232 @@
+"""
+Génération en un seul appel du titre, de la description et des hashtags optimisés,
+par sortie structurée (schéma JSON), avec validation et correction ciblée par champ.
+"""
+import json
+from typing import Dict, Iterator, List
+
+from ytseo import llm
+from ytseo.llm import GPT35, GPT35_stream
+
+TITLE_LENGTH = (50, 60)
+DESCRIPTION_LENGTH = (400, 500)
+HASHTAG_COUNT = (8, 10)
+# Nombre maximal de tours de correction des champs invalides
+MAX_REPAIRS = 2
+# Échecs de génération affichés à l'utilisateur plutôt que relevés
+GENERATION_ERRORS = (llm.OpenAIAuthError, llm.IncompleteResponseError, json.JSONDecodeError)
+
+FIELD_SCHEMAS = {
+    'title': {"type": "string"},
+    'description': {"type": "string"},
+    'hashtags': {"type": "array", "items": {"type": "string"}},
+}
+
+
+def response_format(fields: List[str]) -> dict:
+    """Schéma JSON strict pour les champs demandés (dans cet ordre)."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "youtube_seo_" + "_".join(fields),
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {field: FIELD_SCHEMAS[field] for field in fields},
+                "required": list(fields),
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+METADATA_FORMAT = response_format(['title', 'description', 'hashtags'])
+
+SYSTEM_MESSAGE = (
+    "Vous êtes un assistant de rédaction compétent et expérimenté, spécialisé dans l'optimisation SEO des contenus YouTube. "
+    "Votre mission est de rédiger le titre, la description et les hashtags d'une vidéo : engageants, informatifs et performants en termes de SEO, "
+    "adaptés aux attentes de l'audience et aux bonnes pratiques de référencement. "
+    "Identifier le sujet principal : Définir le thème ou le sujet de la vidéo et l’objectif principal (informer, expliquer, divertir, vendre). "
+    "Prioriser les mots-clés avec un fort volume de recherche et une concurrence modérée/faible. Considérer les variantes spécifiques liées à la niche ou au public cible. "
+    "TITRE : Placer le mot-clé principal au début pour maximiser sa visibilité. Ajouter un mot-clé secondaire ou un complément descriptif. "
+    "Insérer des éléments engageants (chiffres, questions, superlatifs) pour inciter au clic. Utiliser les ? et ! pour impacter. "
+    f"Respecter une longueur de {TITLE_LENGTH[0]} à {TITLE_LENGTH[1]} caractères pour éviter la coupure dans les résultats de recherche. "
+    "Utiliser 1 ou 2 émojis pertinents pour capter l’attention. Mais ne mets JAMAIS 2 émojis a la suite. "
+    "Utiliser les majuscules avec parcimonie pour mettre en valeur des mots-clés ou des éléments importants. "
+    "DESCRIPTION : La premiere phrase doit etre une question incitant TRES impactante pour le viewer en lien avec le mot clé principal. Utilise l'emoji 👇 juste apres la question. "
+    "Développer un résumé clair et attrayant du contenu de la vidéo dans les premières lignes. "
+    "Inclure des phrases contenant des mots-clés secondaires et des compléments pertinents. "
+    f"Respecter une longueur entre {DESCRIPTION_LENGTH[0]} et {DESCRIPTION_LENGTH[1]} caractères, hashtags non compris. "
+    "Ajouter des appels à l’action : Inclure des CTA (Call To Action) pour inviter les spectateurs à liker, s’abonner ou visiter un lien spécifique. "
+    f"HASHTAGS : {HASHTAG_COUNT[0]} à {HASHTAG_COUNT[1]} hashtags stratégiques, chacun commençant par #. "
+    "Pour les deux textes : Ajouter un aspect unique ou une promesse claire (ex. : 'En 5 minutes', 'Sans expérience'). "
+    "Pour des tutoriels, utiliser des formats comme 'Comment...', 'Guide pour...', 'Tuto'. "
+    "Pour des classements ou listes, utiliser 'Top X', 'Les X meilleurs...'. Pour des actualités ou analyses, inclure des termes comme '2024', 'Tendances', 'Analyse'. "
+    "Utiliser un langage clair, simple et engageant. Éviter les textes vagues, génériques ou trop répétitifs. "
+    "Ne mets JAMAIS de préfixe comme 'Titre optimisé:' ou 'Description optimisée:'."
+)
+
+
+def build_prompt(video_title: str, video_description: str, transcript: str) -> str:
+    return (f"Analyse le titre: {video_title}, la description: {video_description or 'aucune'} et le contenu: {transcript or 'non disponible'} "
+            "d'une vidéo YouTube et génère un titre, une description et des hashtags optimisés pour le référencement.")
+
+
+def validate_metadata(metadata: dict) -> Dict[str, str]:
+    """Retourne {champ: problème} pour chaque champ qui ne respecte pas les contraintes."""
+    errors = {}
+    title = metadata.get('title') or ""
+    if not TITLE_LENGTH[0] <= len(title) <= TITLE_LENGTH[1]:
+        errors['title'] = f"le titre fait {len(title)} caractères au lieu de {TITLE_LENGTH[0]} à {TITLE_LENGTH[1]}"
+    description = metadata.get('description') or ""
+    if not DESCRIPTION_LENGTH[0] <= len(description) <= DESCRIPTION_LENGTH[1]:
+        errors['description'] = (f"la description fait {len(description)} caractères au lieu de "
+                                 f"{DESCRIPTION_LENGTH[0]} à {DESCRIPTION_LENGTH[1]}")
+    hashtags = metadata.get('hashtags') or []
+    if not HASHTAG_COUNT[0] <= len(hashtags) <= HASHTAG_COUNT[1]:
+        errors['hashtags'] = f"{len(hashtags)} hashtags au lieu de {HASHTAG_COUNT[0]} à {HASHTAG_COUNT[1]}"
+    elif not all(isinstance(tag, str) and tag.startswith("#") and " " not in tag for tag in hashtags):
+        errors['hashtags'] = "chaque hashtag doit commencer par # et ne pas contenir d'espace"
+    return errors
+
+
+def repair_field(api_key: str, prompt: str, metadata: dict, field: str, problem: str) -> object:
+    """Redemande uniquement le champ invalide, avec le reste du résultat pour contexte."""
+    repair_prompt = (
+        f"{prompt}\n\nRésultat actuel : {json.dumps(metadata, ensure_ascii=False)}\n"
+        f"Problème : {problem}. Réécris uniquement le champ '{field}' en corrigeant ce problème."
+    )
+    content = GPT35(repair_prompt, SYSTEM_MESSAGE, api_key, response_format=response_format([field]))
+    return json.loads(content)[field]
+
+
+def finalize_metadata(api_key: str, prompt: str, metadata: dict, max_repairs: int = MAX_REPAIRS) -> dict:
+    """
+    Valide le résultat et corrige les champs invalides (en parallèle), sans regénérer les autres.
+    Les champs encore invalides après `max_repairs` tours sont listés dans 'invalid_fields'.
+    """
+    errors = validate_metadata(metadata)
+    for _ in range(max_repairs):
+        if not errors:
+            break
+        fields = list(errors)
+        values = llm.get_executor().run([
+            (lambda field=field: repair_field(api_key, prompt, metadata, field, errors[field])) for field in fields
+        ])
+        metadata = {**metadata, **dict(zip(fields, values))}
+        errors = validate_metadata(metadata)
+    return {**metadata, 'invalid_fields': sorted(errors)}
+
+
+def generate_optimized_metadata(api_key: str, video_title: str, video_description: str, transcript: str = "",
+                                regenerate: bool = False, max_repairs: int = MAX_REPAIRS) -> dict:
+    """
+    Un seul appel pour {title, description, hashtags} : le titre, la description et la
+    transcription ne sont envoyés (et facturés) qu'une fois.
+    """
+    prompt = build_prompt(video_title, video_description, transcript)
+    content = GPT35(prompt, SYSTEM_MESSAGE, api_key, regenerate=regenerate, response_format=METADATA_FORMAT)
+    return finalize_metadata(api_key, prompt, json.loads(content), max_repairs)
+
+
+def generation_error_message(error: Exception) -> str:
+    """Message affiché pour une des GENERATION_ERRORS."""
+    if isinstance(error, llm.OpenAIAuthError):
+        return str(error)
+    if isinstance(error, llm.IncompleteResponseError):
+        return f"{error} Veuillez relancer la génération."
+    return "Réponse du modèle incomplète ou invalide (JSON tronqué). Veuillez relancer la génération."
+
+
+def format_description(metadata: dict) -> str:
+    """Description prête à coller sur YouTube : texte puis hashtags."""
+    return f"{metadata.get('description', '')}\n\n{' '.join(metadata.get('hashtags', []))}".strip()
+
+
+class StructuredStream:
+    """
+    Lecture progressive d'une réponse JSON en flux : `field(nom)` produit le texte d'un champ
+    chaîne au fur et à mesure qu'il arrive, `result()` attend la fin et retourne l'objet complet.
+    Les champs doivent être lus dans l'ordre du schéma.
+    """
+
+    def __init__(self, chunks: Iterator[str], prompt: str = ""):
+        # Prompt de la requête, repris par finalize_metadata pour corriger les champs
+        self.prompt = prompt
+        self._chunks = iter(chunks)
+        self._buffer = ""
+        self._position = 0
+        self._done = False
+
+    def _read(self) -> bool:
+        if self._done:
+            return False
+        try:
+            self._buffer += next(self._chunks)
+            return True
+        except StopIteration:
+            self._done = True
+            return False
+
+    def field(self, name: str) -> Iterator[str]:
+        marker = f'"{name}"'
+        # Attendre le début de la valeur : "name" : "
+        while True:
+            start = self._buffer.find(marker, self._position)
+            if start != -1:
+                rest = self._buffer[start + len(marker):].lstrip()
+                if rest.startswith(":"):
+                    value = rest[1:].lstrip()
+                    if value.startswith('"'):
+                        self._position = len(self._buffer) - len(value) + 1
+                        break
+            if not self._read():
+                return
+        # Décoder la chaîne au fil de l'eau, séquences d'échappement comprises
+        while True:
+            text, consumed, closed = _decode_partial_string(self._buffer, self._position)
+            self._position = consumed
+            if text:
+                yield text
+            if closed:
+                return
+            if not self._read():
+                return
+
+    def result(self) -> dict:
+        while self._read():
+            pass
+        return json.loads(self._buffer)
+
+
+def _decode_partial_string(buffer: str, position: int):
+    """Décode le contenu d'une chaîne JSON à partir de `position` ; retourne (texte, position, fermée)."""
+    parts = []
+    index = position
+    while index < len(buffer):
+        char = buffer[index]
+        if char == '"':
+            return "".join(parts), index + 1, True
+        if char != "\\":
+            parts.append(char)
+            index += 1
+            continue
+        if index + 1 >= len(buffer):
+            break
+        length = 6 if buffer[index + 1] == "u" else 2
+        # Paire de substitution UTF-16 (🚀) : attendre les deux moitiés
+        if length == 6 and buffer[index + 2:index + 3].lower() == "d" and buffer[index + 3:index + 4].lower() in "89ab":
+            length = 12
+        if index + length > len(buffer):
+            break
+        parts.append(json.loads(f'"{buffer[index:index + length]}"'))
+        index += length
+    return "".join(parts), index, False
+
+
+def stream_optimized_metadata(api_key: str, video_title: str, video_description: str, transcript: str = "",
+                              regenerate: bool = False) -> StructuredStream:
+    """Même requête que generate_optimized_metadata, lue en flux (valider ensuite avec finalize_metadata et `prompt`)."""
+    prompt = build_prompt(video_title, video_description, transcript)
+    return StructuredStream(GPT35_stream(prompt, SYSTEM_MESSAGE, api_key, regenerate=regenerate,
+                                         response_format=METADATA_FORMAT), prompt)
@@ -0,0 +1,194 @@
+"""Suggestions de recherche YouTube (suggestqueries.google.com)."""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+from ytseo import http_client, metrics
+from ytseo.cache import normalize_query
+from ytseo.suggest_index import get_suggestion_index
+
+SUGGEST_URL = os.environ.get("SUGGEST_URL", "https://suggestqueries.google.com/complete/search")
+SUGGESTIONS_TTL = 24 * 3600
+DEFAULT_CRAWL_WORKERS = int(os.environ.get("SUGGEST_CRAWL_WORKERS", "16"))
+# Suggestions « en direct » : mémoire du processus, avant même le cache disque
+LIVE_MEMO_TTL = 600
+LIVE_MEMO_SIZE = 2048
+# Après un échec, la même requête n'est pas retentée avant ce délai
+LIVE_ERROR_COOLDOWN = 30
+MIN_LIVE_QUERY_LENGTH = 2
+
+
+@metrics.timed("fetch_suggestions")
+def fetch_suggestions(query: str, language: Optional[str] = None) -> List[str]:
+    """
+    Récupère les suggestions de recherche YouTube pour un mot-clé donné : depuis l'index
+    local si la requête y est et date de moins de SUGGESTIONS_TTL, sinon par le réseau.
+    """
+    index = get_suggestion_index()
+    suggestions = index.get(query, language, SUGGESTIONS_TTL)
+    if suggestions is not None:
+        return suggestions
+
+    params = {"client": "firefox", "ds": "yt", "hl": language, "q": query}
+    response = http_client.get(SUGGEST_URL, params={k: v for k, v in params.items() if v is not None})
+    response.raise_for_status()
+    suggestions = response.json()[1]
+    index.record(query, language, suggestions)
+    return suggestions
+
+
+class LiveSuggestions:
+    """
+    Suggestions pour la saisie en cours, appelées à chaque relance du script.
+    Mémoire LRU à durée limitée clé (requête normalisée, langue), un seul appel réseau
+    à la fois par clé (les appels simultanés attendent le même résultat) et, après une
+    erreur, un délai avant de retenter plutôt qu'un appel à chaque relance.
+    """
+
+    def __init__(self, fetch: Callable[[str, Optional[str]], List[str]] = fetch_suggestions,
+                 ttl: float = LIVE_MEMO_TTL, error_cooldown: float = LIVE_ERROR_COOLDOWN,
+                 max_entries: int = LIVE_MEMO_SIZE):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.error_cooldown = error_cooldown
+        self.max_entries = max_entries
+        self._memo: "OrderedDict[Tuple[str, Optional[str]], Tuple[float, object]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, Optional[str]], Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fetches = 0
+
+    def get(self, query: str, language: Optional[str] = None) -> List[str]:
+        """Suggestions pour `query` ; relève l'erreur du dernier appel tant que le délai court."""
+        key = (normalize_query(query), language)
+        if len(key[0]) < MIN_LIVE_QUERY_LENGTH:
+            return []
+        with self._lock:
+            entry = self._memo.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._memo.move_to_end(key)
+                self.hits += 1
+                return _unwrap(entry[1])
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.hits += 1
+        if not owner:
+            return future.result()
+
+        value, ttl = None, self.ttl
+        try:
+            self.fetches += 1
+            value = self.fetch(key[0], language)
+        except requests.RequestException as e:
+            value, ttl = e, self.error_cooldown
+        except BaseException as e:
+            # Erreur inattendue : transmise aux appels en attente, mais ni mémorisée ni mise en délai
+            value, ttl = e, None
+            raise
+        finally:
+            with self._lock:
+                if ttl is not None:
+                    self._memo[key] = (time.monotonic() + ttl, value)
+                    self._memo.move_to_end(key)
+                    while len(self._memo) > self.max_entries:
+                        self._memo.popitem(last=False)
+                del self._inflight[key]
+            if isinstance(value, BaseException):
+                future.set_exception(value)
+            else:
+                future.set_result(value)
+        return _unwrap(value)
+
+
+def _unwrap(value):
+    if isinstance(value, Exception):
+        raise value
+    return value
+
+
+_live: Optional[LiveSuggestions] = None
+_live_lock = threading.Lock()
+
+
+def get_live_suggestions() -> LiveSuggestions:
+    """Instance partagée par toutes les sessions du processus."""
+    global _live
+    with _live_lock:
+        if _live is None:
+            _live = LiveSuggestions()
+        return _live
+
+
+class SuggestionCrawler:
+    """
+    Parcours en largeur des suggestions à partir d'un mot-clé.
+    Chaque niveau est récupéré en parallèle (pool borné) et une requête déjà
+    visitée (après normalisation) n'est ni redemandée ni ré-ajoutée à l'arbre.
+    """
+
+    def __init__(self, language: Optional[str], fan_out: int = 10, depth: int = 2,
+                 max_workers: int = DEFAULT_CRAWL_WORKERS,
+                 fetch: Callable[[str, Optional[str]], List[str]] = fetch_suggestions):
+        self.language = language
+        self.fan_out = fan_out
+        self.depth = depth
+        self.max_workers = max_workers
+        self.fetch = fetch
+        self.visited = set()
+        self.errors = []
+
+    def _fetch(self, query: str) -> List[str]:
+        try:
+            return self.fetch(query, self.language)
+        except requests.RequestException as e:
+            self.errors.append((query, e))
+            return []
+
+    def crawl(self, root_keyword: str) -> Iterator[Tuple[int, Dict[str, List[str]]]]:
+        """
+        Produit, niveau par niveau, (profondeur, {parent: [suggestions nouvelles]})
+        dès que toutes les requêtes du niveau sont terminées.
+        """
+        self.visited.add(normalize_query(root_keyword))
+        frontier = [root_keyword]
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="suggest") as pool:
+            for level in range(1, self.depth + 1):
+                if not frontier:
+                    break
+                results = pool.map(self._fetch, frontier)
+                level_tree = {}
+                next_frontier = []
+                for parent, suggestions in zip(frontier, results):
+                    children = []
+                    for suggestion in suggestions:
+                        if len(children) >= self.fan_out:
+                            break
+                        normalized = normalize_query(suggestion)
+                        if normalized in self.visited:
+                            continue
+                        self.visited.add(normalized)
+                        children.append(suggestion)
+                    if children:
+                        level_tree[parent] = children
+                        next_frontier.extend(children)
+                yield level, level_tree
+                frontier = next_frontier
+
+    def build_tree(self, root_keyword: str,
+                   on_level: Optional[Callable[[int, Dict[str, List[str]]], None]] = None) -> Dict[str, List[str]]:
+        """Arbre complet {parent: [suggestions]} ; `on_level` est appelé dès qu'un niveau est complet."""
+        tree = {}
+        for level, level_tree in self.crawl(root_keyword):
+            for parent, children in level_tree.items():
+                tree.setdefault(parent, []).extend(children)
+            if on_level is not None:
+                on_level(level, level_tree)
+        return tree
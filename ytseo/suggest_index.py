@@ -0,0 +1,195 @@
+"""
+Index local des suggestions : chaque réponse de suggestqueries est rangée dans un trie de
+préfixes, par langue, avec sa date de récupération. Les nœuds sont persistés dans SQLite
+(clé (langue, requête) triée : un sous-arbre y est une plage contiguë) et rechargés en
+mémoire, où une recherche ne coûte que quelques microsecondes.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ytseo import metrics
+from ytseo.cache import CACHE_DIR, normalize_query
+
+# Au-delà, un nœud est périmé : il reste exportable mais la requête repart sur le réseau
+MAX_AGE = 24 * 3600
+# Les nœuds plus anciens sont supprimés au chargement d'une langue
+RETENTION = 30 * 24 * 3600
+
+
+class _Node:
+    __slots__ = ("children", "suggestions", "fetched_at")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.suggestions: Optional[List[str]] = None
+        self.fetched_at = 0.0
+
+
+class SuggestionIndex:
+    """
+    Trie des requêtes déjà envoyées (normalisées), un par langue, chargé au premier accès.
+    Les lectures ne prennent pas de verrou ; un nœud absent ou périmé en mémoire est relu
+    sur disque, où un autre processus a pu l'enregistrer entre-temps.
+    """
+
+    def __init__(self, path: str, max_age: float = MAX_AGE, retention: float = RETENTION):
+        self.path = path
+        self.max_age = max_age
+        self.retention = retention
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self._roots: Dict[str, _Node] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS nodes ("
+            " language TEXT NOT NULL, query TEXT NOT NULL,"
+            " suggestions TEXT NOT NULL, fetched_at REAL NOT NULL,"
+            " PRIMARY KEY (language, query)) WITHOUT ROWID"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            if self.path != ":memory:":
+                connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _root(self, language: Optional[str]) -> _Node:
+        key = language or ""
+        root = self._roots.get(key)
+        if root is None:
+            with self._lock:
+                root = self._roots.get(key)
+                if root is None:
+                    root = self._roots[key] = self._load(key)
+        return root
+
+    def _load(self, language: str) -> _Node:
+        """Trie d'une langue reconstruit depuis le disque, sans les nœuds au-delà de la rétention."""
+        connection = self._connection()
+        connection.execute("DELETE FROM nodes WHERE language = ? AND fetched_at < ?",
+                           (language, time.time() - self.retention))
+        root = _Node()
+        for query, suggestions, fetched_at in connection.execute(
+                "SELECT query, suggestions, fetched_at FROM nodes WHERE language = ?", (language,)):
+            node = _insert(root, query)
+            node.suggestions, node.fetched_at = json.loads(suggestions), fetched_at
+        return root
+
+    def _count(self, result: str):
+        with self._lock:
+            if result == "hit":
+                self.hits += 1
+            elif result == "miss":
+                self.misses += 1
+            else:
+                self.stale += 1
+        metrics.inc("suggest_index_lookups_total", result=result)
+
+    def get(self, query: str, language: Optional[str] = None, max_age: Optional[float] = None) -> Optional[List[str]]:
+        """Suggestions enregistrées pour cette requête exacte, ou None si absentes ou périmées."""
+        key = normalize_query(query)
+        oldest = time.time() - (self.max_age if max_age is None else max_age)
+        node = _find(self._root(language), key)
+        if node is None or node.suggestions is None or node.fetched_at < oldest:
+            row = self._connection().execute(
+                "SELECT suggestions, fetched_at FROM nodes WHERE language = ? AND query = ?",
+                (language or "", key),
+            ).fetchone()
+            if row is None or (node is not None and row[1] <= node.fetched_at):
+                self._count("miss" if node is None or node.suggestions is None else "stale")
+                return None
+            node = self._store(language, key, json.loads(row[0]), row[1])
+            if node.fetched_at < oldest:
+                self._count("stale")
+                return None
+        self._count("hit")
+        return list(node.suggestions)
+
+    def record(self, query: str, language: Optional[str], suggestions: List[str],
+               fetched_at: Optional[float] = None):
+        """Enregistre une réponse du service de suggestions (en mémoire et sur disque)."""
+        key = normalize_query(query)
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        self._connection().execute(
+            "INSERT OR REPLACE INTO nodes (language, query, suggestions, fetched_at) VALUES (?, ?, ?, ?)",
+            (language or "", key, json.dumps(suggestions, ensure_ascii=False), fetched_at),
+        )
+        self._store(language, key, list(suggestions), fetched_at)
+
+    def _store(self, language: Optional[str], key: str, suggestions: List[str], fetched_at: float) -> _Node:
+        root = self._root(language)
+        with self._lock:
+            node = _insert(root, key)
+            node.suggestions, node.fetched_at = suggestions, fetched_at
+        return node
+
+    def export(self, prefix: str = "", language: Optional[str] = None) -> Dict[str, dict]:
+        """
+        Sous-arbre sous `prefix` (périmés compris), dans l'ordre alphabétique :
+        {requête: {'suggestions': [...], 'fetched_at': horodatage}}.
+        """
+        key = normalize_query(prefix)
+        node = _find(self._root(language), key)
+        exported = {}
+        if node is None:
+            return exported
+        stack: List[Tuple[str, _Node]] = [(key, node)]
+        with self._lock:
+            while stack:
+                query, node = stack.pop()
+                if node.suggestions is not None:
+                    exported[query] = {'suggestions': list(node.suggestions), 'fetched_at': node.fetched_at}
+                stack.extend((query + char, child) for char, child in sorted(node.children.items(), reverse=True))
+        return exported
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses + self.stale
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+def _find(root: _Node, key: str) -> Optional[_Node]:
+    node = root
+    for char in key:
+        node = node.children.get(char)
+        if node is None:
+            return None
+    return node
+
+
+def _insert(root: _Node, key: str) -> _Node:
+    node = root
+    for char in key:
+        child = node.children.get(char)
+        if child is None:
+            child = node.children[char] = _Node()
+        node = child
+    return node
+
+
+_index: Optional[SuggestionIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_suggestion_index() -> SuggestionIndex:
+    """Index partagé par tout le processus, dans CACHE_DIR/suggestions.sqlite."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SuggestionIndex(os.path.join(CACHE_DIR, "suggestions.sqlite"))
+        return _index
@@ -0,0 +1,158 @@
+"""
+Résumé extractif local des transcriptions : sélection des phrases les plus représentatives
+(TF-IDF + TextRank, calculs vectorisés NumPy) dans un budget de tokens fixe, pour envoyer au
+modèle un contexte couvrant toute la vidéo plutôt que ses 250 premiers mots.
+"""
+import re
+from typing import TYPE_CHECKING, List
+
+from ytseo.llm import estimate_tokens
+
+if TYPE_CHECKING:
+    import numpy
+
+# Budget de contexte envoyé au modèle (~ 450 mots)
+DEFAULT_TOKEN_BUDGET = 600
+# Les sous-titres générés n'ont souvent aucune ponctuation : découper les passages trop longs
+MAX_UNIT_WORDS = 40
+MIN_UNIT_WORDS = 4
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 50
+TEXTRANK_TOLERANCE = 1e-6
+# Marque les passages omis entre deux extraits
+GAP_MARKER = " […] "
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+_WORD = re.compile(r"[^\W\d_]{3,}")
+
+STOPWORDS = frozenset("""
+les des une est pas que qui dans pour par sur avec plus mais ont son ses aux cette ces elle
+ils nous vous leur leurs tout tous tres très bien fait faire comme donc alors aussi être avoir
+été sont suis était vais va voilà ouais juste quand même encore peu après avant moi toi lui
+the and for are but not you your with this that have has was were they them what which
+will would can could just like know yeah okay really there their then than from into about
+""".split())
+
+
+def split_units(text: str) -> List[str]:
+    """Découpe le texte en phrases, en coupant les passages sans ponctuation tous les MAX_UNIT_WORDS mots."""
+    units = []
+    for sentence in _SENTENCE_END.split(" ".join(text.split())):
+        words = sentence.split()
+        for start in range(0, len(words), MAX_UNIT_WORDS):
+            chunk = words[start:start + MAX_UNIT_WORDS]
+            # Rattacher un reliquat trop court au morceau précédent
+            if len(chunk) < MIN_UNIT_WORDS and start and units:
+                units[-1] += " " + " ".join(chunk)
+            elif chunk:
+                units.append(" ".join(chunk))
+    return units
+
+
+def _numpy():
+    # NumPy n'est chargé qu'au premier texte qui dépasse le budget
+    import numpy
+    return numpy
+
+
+def _tfidf_entries(units: List[str]):
+    """
+    Matrice TF-IDF (phrases x termes) normalisée L2, sous forme creuse (lignes, colonnes, valeurs),
+    limitée aux termes présents dans au moins deux phrases.
+    """
+    np = _numpy()
+    vocabulary = {}
+    rows, cols = [], []
+    for row, unit in enumerate(units):
+        for word in _WORD.findall(unit.lower()):
+            if word not in STOPWORDS:
+                rows.append(row)
+                cols.append(vocabulary.setdefault(word, len(vocabulary)))
+    n_units = len(units)
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    n_terms = max(len(vocabulary), 1)
+
+    # Fréquences par (phrase, terme) et fréquence documentaire par terme
+    pairs, counts = np.unique(rows * n_terms + cols, return_counts=True)
+    pair_rows, pair_cols = np.divmod(pairs, n_terms)
+    df = np.bincount(pair_cols, minlength=n_terms)
+    idf = np.log((1 + n_units) / (1 + df)) + 1.0
+    weights = (1 + np.log(counts)) * idf[pair_cols]
+
+    # La norme tient compte de tous les termes, mais un terme vu dans une seule phrase
+    # ne contribue à aucune similarité : inutile de le garder.
+    norms = np.sqrt(np.bincount(pair_rows, weights=weights ** 2, minlength=n_units))
+    keep = df[pair_cols] >= 2
+    pair_rows, pair_cols = pair_rows[keep], pair_cols[keep]
+    return pair_rows, pair_cols, weights[keep] / norms[pair_rows]
+
+
+def score_units(units: List[str]) -> "numpy.ndarray":
+    """
+    Score TextRank de chaque phrase sur le graphe des similarités cosinus TF-IDF.
+    La matrice de similarité S = X·Xᵀ n'est jamais construite : chaque itération
+    applique X puis Xᵀ à un vecteur, en O(nombre de termes) plutôt qu'en O(phrases²).
+    """
+    np = _numpy()
+    n_units = len(units)
+    if n_units == 0:
+        return np.zeros(0)
+    rows, cols, values = _tfidf_entries(units)
+    n_terms = int(cols.max()) + 1 if cols.size else 0
+
+    def similarity_times(vector: "numpy.ndarray") -> "numpy.ndarray":
+        # (X·Xᵀ − diag) · vector : les boucles d'une phrase sur elle-même sont exclues
+        projected = np.bincount(cols, weights=values * vector[rows], minlength=n_terms)
+        return np.bincount(rows, weights=values * projected[cols], minlength=n_units) - self_similarity * vector
+
+    self_similarity = np.bincount(rows, weights=values ** 2, minlength=n_units)
+    out_weight = similarity_times(np.ones(n_units))
+    # Bruit d'arrondi : une phrase sans voisin a un poids sortant nul
+    dangling = out_weight <= 1e-9
+    out_weight[dangling] = 1.0
+
+    scores = np.full(n_units, 1.0 / n_units)
+    teleport = (1 - TEXTRANK_DAMPING) / n_units
+    for _ in range(TEXTRANK_ITERATIONS):
+        spread = np.where(dangling, 0.0, scores / out_weight)
+        # Une phrase sans voisin redistribue son score uniformément
+        updated = teleport + TEXTRANK_DAMPING * (similarity_times(spread) + scores[dangling].sum() / n_units)
+        if np.abs(updated - scores).sum() < TEXTRANK_TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def condense(text: str, token_budget: int = DEFAULT_TOKEN_BUDGET) -> str:
+    """
+    Retourne les phrases les mieux classées qui tiennent dans `token_budget`, dans leur
+    ordre d'apparition. Un texte qui tient déjà dans le budget est rendu tel quel.
+    """
+    text = " ".join(text.split())
+    if estimate_tokens(text) <= token_budget:
+        return text
+    np = _numpy()
+    units = split_units(text)
+    # Chaque phrase est comptée avec son séparateur éventuel ("[…]")
+    costs = np.array([estimate_tokens(unit, GAP_MARKER) for unit in units])
+    chosen = []
+    spent = 0
+    for index in np.argsort(-score_units(units), kind="stable"):
+        if spent + costs[index] <= token_budget:
+            chosen.append(index)
+            spent += costs[index]
+    return GAP_MARKER.join(_join_runs(units, sorted(chosen)))
+
+
+def _join_runs(units: List[str], indices: List[int]) -> List[str]:
+    """Regroupe les phrases consécutives ; les coupures sont marquées entre les groupes."""
+    runs = []
+    previous = None
+    for index in indices:
+        if previous is not None and index == previous + 1:
+            runs[-1] += " " + units[index]
+        else:
+            runs.append(units[index])
+        previous = index
+    return runs
@@ -0,0 +1,353 @@
+"""
+Récupération des transcriptions YouTube avec un stockage local compressé.
+Les segments sont conservés par (video_id, langue, is_generated) et la liste des pistes
+disponibles est mémorisée, y compris quand elle est vide (vidéo sans sous-titres).
+"""
+import importlib.util
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple, Union
+
+from ytseo import metrics
+from ytseo.cache import CACHE_DIR
+from ytseo.segments import TranscriptSegments
+
+# Une vidéo sans sous-titres peut en recevoir plus tard : on la re-vérifie au bout d'une semaine
+LISTING_TTL = 7 * 24 * 3600
+MEMORY_ENTRIES = 256
+# Remplaçant de youtube-transcript-api installé par use_backend (None : la bibliothèque)
+_backend = None
+
+
+class TranscriptUnavailable(Exception):
+    """Aucune transcription ne correspond à la demande."""
+
+
+def use_backend(backend):
+    """
+    Remplace youtube-transcript-api par `backend`, qui offre list(video_id) comme
+    YouTubeTranscriptApi() ; une vidéo sans sous-titres y lève TranscriptUnavailable.
+    """
+    global _backend
+    _backend = backend
+
+
+def is_available() -> bool:
+    """youtube-transcript-api (ou un remplaçant) est-il disponible ? (vérifié sans l'importer)"""
+    return _backend is not None or importlib.util.find_spec("youtube_transcript_api") is not None
+
+
+def _unavailable_errors() -> tuple:
+    """Exceptions signifiant que la vidéo n'a pas de sous-titres."""
+    if _backend is not None:
+        return (TranscriptUnavailable,)
+    from youtube_transcript_api import TranscriptsDisabled, VideoUnavailable
+    return (TranscriptsDisabled, VideoUnavailable)
+
+
+def _to_segments(fetched) -> TranscriptSegments:
+    """Convertit le retour de Transcript.fetch() (liste de dicts ou FetchedTranscript) en segments compacts."""
+    if hasattr(fetched, "to_raw_data"):
+        fetched = fetched.to_raw_data()
+    return TranscriptSegments.from_segments(fetched)
+
+
+def list_transcripts(video_id: str):
+    """Appelle l'API de listing, quelle que soit la version de youtube-transcript-api."""
+    if _backend is not None:
+        return _backend.list(video_id)
+    from youtube_transcript_api import YouTubeTranscriptApi
+    if hasattr(YouTubeTranscriptApi, "list_transcripts"):
+        return YouTubeTranscriptApi.list_transcripts(video_id)
+    return YouTubeTranscriptApi().list(video_id)
+
+
+def describe_track(transcript) -> dict:
+    return {
+        'language': transcript.language_code,
+        'language_name': transcript.language,
+        'is_generated': bool(transcript.is_generated),
+        'is_translatable': bool(getattr(transcript, 'is_translatable', False)),
+    }
+
+
+class TranscriptStore:
+    """
+    Stockage SQLite partagé entre sessions et processus, doublé d'un LRU en mémoire.
+    Les segments sont stockés en JSON compressé zlib et gardés en mémoire sous forme compacte.
+    """
+
+    def __init__(self, path: str, memory_entries: int = MEMORY_ENTRIES):
+        self.path = path
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS segments ("
+            " video_id TEXT NOT NULL, language TEXT NOT NULL, is_generated INTEGER NOT NULL,"
+            " data BLOB NOT NULL, fetched_at REAL NOT NULL,"
+            " PRIMARY KEY (video_id, language, is_generated))"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS listings ("
+            " video_id TEXT PRIMARY KEY, tracks TEXT NOT NULL, listed_at REAL NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            if self.path != ":memory:":
+                connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _remember(self, key: Tuple, segments: TranscriptSegments):
+        with self._lock:
+            self._memory[key] = segments
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get_segments(self, video_id: str, language: str,
+                     is_generated: Optional[bool] = None) -> Optional[TranscriptSegments]:
+        """Segments stockés pour cette langue ; sans précision, la piste manuelle est préférée."""
+        candidates = [False, True] if is_generated is None else [is_generated]
+        for generated in candidates:
+            key = (video_id, language, generated)
+            with self._lock:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    return self._memory[key]
+            row = self._connection().execute(
+                "SELECT data FROM segments WHERE video_id = ? AND language = ? AND is_generated = ?",
+                (video_id, language, int(generated)),
+            ).fetchone()
+            if row is not None:
+                segments = TranscriptSegments.from_segments(json.loads(zlib.decompress(row[0]).decode("utf-8")))
+                self._remember(key, segments)
+                return segments
+        return None
+
+    def put_segments(self, video_id: str, language: str, is_generated: bool,
+                     segments: Union[TranscriptSegments, List[dict]]) -> TranscriptSegments:
+        segments = TranscriptSegments.from_segments(segments)
+        data = zlib.compress(json.dumps(segments.to_list(), ensure_ascii=False).encode("utf-8"))
+        self._connection().execute(
+            "INSERT OR REPLACE INTO segments (video_id, language, is_generated, data, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (video_id, language, int(is_generated), data, time.time()),
+        )
+        self._remember((video_id, language, bool(is_generated)), segments)
+        return segments
+
+    def get_listing(self, video_id: str) -> Optional[List[dict]]:
+        """Pistes disponibles connues ; [] signifie « pas de sous-titres », None « inconnu ou périmé »."""
+        row = self._connection().execute(
+            "SELECT tracks, listed_at FROM listings WHERE video_id = ?", (video_id,)
+        ).fetchone()
+        if row is None or time.time() - row[1] > LISTING_TTL:
+            return None
+        return json.loads(row[0])
+
+    def put_listing(self, video_id: str, tracks: List[dict]):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO listings (video_id, tracks, listed_at) VALUES (?, ?, ?)",
+            (video_id, json.dumps(tracks, ensure_ascii=False), time.time()),
+        )
+
+
+_store: Optional[TranscriptStore] = None
+_store_lock = threading.Lock()
+
+
+def get_transcript_store() -> TranscriptStore:
+    """Stockage partagé par tout le processus, dans CACHE_DIR/transcripts.sqlite."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TranscriptStore(os.path.join(CACHE_DIR, "transcripts.sqlite"))
+        return _store
+
+
+def find_track(tracks: List[dict], languages: Sequence[str]) -> Optional[dict]:
+    """Même règle que TranscriptList.find_transcript : par langue, la piste manuelle d'abord."""
+    for language in languages:
+        for generated in (False, True):
+            for track in tracks:
+                if track['language'] == language and track['is_generated'] == generated:
+                    return track
+    return None
+
+
+@metrics.timed("list_tracks")
+def list_tracks(video_id: str) -> Tuple[List[dict], object]:
+    """
+    Liste les pistes d'une vidéo et mémorise le résultat.
+    Retourne (pistes, TranscriptList) ; une vidéo sans sous-titres donne une liste vide.
+    """
+    unavailable = _unavailable_errors()
+    store = get_transcript_store()
+    try:
+        transcript_list = list_transcripts(video_id)
+    except unavailable:
+        store.put_listing(video_id, [])
+        return [], None
+    tracks = [describe_track(transcript) for transcript in transcript_list]
+    store.put_listing(video_id, tracks)
+    return tracks, transcript_list
+
+
+@metrics.timed("fetch_track")
+def fetch_track(video_id: str, transcript) -> TranscriptSegments:
+    """Télécharge une piste (objet Transcript) en passant par le stockage local."""
+    store = get_transcript_store()
+    segments = store.get_segments(video_id, transcript.language_code, bool(transcript.is_generated))
+    if segments is None:
+        segments = _to_segments(transcript.fetch())
+        store.put_segments(video_id, transcript.language_code, bool(transcript.is_generated), segments)
+    return segments
+
+
+@metrics.timed("fetch_transcript")
+def fetch_transcript(video_id: str, languages: Sequence[str] = ('en',),
+                     use_store: bool = True) -> TranscriptSegments:
+    """
+    Équivalent de YouTubeTranscriptApi.get_transcript avec stockage local.
+    Une transcription n'est téléchargée qu'une fois ; une vidéo sans sous-titres
+    ou sans piste dans les langues demandées ne coûte plus aucun appel réseau.
+    """
+    store = get_transcript_store()
+    if use_store:
+        tracks = store.get_listing(video_id)
+        if tracks is not None:
+            track = find_track(tracks, languages)
+            if track is None:
+                raise TranscriptUnavailable(f"No transcript for {video_id} in {list(languages)}")
+            segments = store.get_segments(video_id, track['language'], track['is_generated'])
+            if segments is not None:
+                return segments
+
+    tracks, transcript_list = list_tracks(video_id)
+    track = find_track(tracks, languages)
+    if track is None:
+        raise TranscriptUnavailable(f"No transcript for {video_id} in {list(languages)}")
+    transcript = transcript_list.find_transcript([track['language']])
+    if not use_store:
+        return _to_segments(transcript.fetch())
+    return fetch_track(video_id, transcript)
+
+
+# Ordre de repli quand la langue préférée n'est pas disponible
+FALLBACK_LANGUAGES = ('en', 'fr', 'es', 'de', 'it', 'pt', 'ru', 'ja', 'ko', 'zh')
+
+# Cumul sur le processus des appels effectués et évités par resolve_transcript
+resolver_stats = {'resolved': 0, 'calls': 0, 'calls_saved': 0}
+_resolver_stats_lock = threading.Lock()
+
+
+def rank_tracks(tracks: List[dict], preferred_language: str,
+                fallback_languages: Sequence[str] = FALLBACK_LANGUAGES) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    Choisit la meilleure piste parmi celles listées, sans appel réseau.
+    Ordre : manuelle puis générée dans les langues prioritaires (préférée puis repli),
+    puis traduction d'une piste traduisible vers la langue préférée, puis n'importe quelle piste.
+    Retourne (piste, langue cible de traduction ou None).
+    """
+    priority = list(dict.fromkeys([preferred_language, *fallback_languages]))
+    for generated in (False, True):
+        candidates = [t for t in tracks if t['is_generated'] == generated and t['language'] in priority]
+        if candidates:
+            return min(candidates, key=lambda t: priority.index(t['language'])), None
+    translatable = [t for t in tracks if t['is_translatable']]
+    if translatable:
+        return min(translatable, key=lambda t: t['is_generated']), preferred_language
+    if tracks:
+        return tracks[0], None
+    return None, None
+
+
+def legacy_ladder_calls(tracks: List[dict], preferred_language: str) -> int:
+    """
+    Nombre d'appels réseau qu'aurait faits l'ancienne cascade de get_transcript langue par langue :
+    chaque tentative liste les pistes (1 appel), la tentative réussie télécharge en plus (2 appels).
+    """
+    attempts = [[preferred_language]]
+    if preferred_language != 'en':
+        attempts.append(['en'])
+    if preferred_language != 'fr':
+        attempts.append(['fr'])
+    attempts.append(['en'])  # get_transcript sans langue = ('en',)
+    attempts.extend([language] for language in FALLBACK_LANGUAGES)
+    for index, languages in enumerate(attempts, 1):
+        if find_track(tracks, languages) is not None:
+            return index + 1
+    return len(attempts)
+
+
+@metrics.timed("resolve_transcript")
+def resolve_transcript(video_id: str, preferred_language: str = 'fr',
+                       fallback_languages: Sequence[str] = FALLBACK_LANGUAGES) -> Optional[dict]:
+    """
+    Récupère la meilleure transcription avec un seul listing et un seul téléchargement
+    (zéro appel si tout est déjà dans le stockage local).
+    Retourne None si la vidéo n'a aucune piste exploitable.
+    """
+    store = get_transcript_store()
+    calls = 0
+    transcript_list = None
+    tracks = store.get_listing(video_id)
+    if tracks is None:
+        tracks, transcript_list = list_tracks(video_id)
+        calls += 1
+
+    track, translate_to = rank_tracks(tracks, preferred_language, fallback_languages)
+    result = None
+    if track is not None:
+        # Les traductions sont stockées sous une langue « source->cible »
+        language = f"{track['language']}->{translate_to}" if translate_to else track['language']
+        segments = store.get_segments(video_id, language, track['is_generated'])
+        if segments is None:
+            if transcript_list is None:
+                transcript_list = list_transcripts(video_id)
+                calls += 1
+            transcript = next(t for t in transcript_list
+                              if t.language_code == track['language'] and bool(t.is_generated) == track['is_generated'])
+            if translate_to:
+                segments = _to_segments(transcript.translate(translate_to).fetch())
+                store.put_segments(video_id, language, track['is_generated'], segments)
+            else:
+                segments = fetch_track(video_id, transcript)
+            calls += 1
+
+        if translate_to:
+            kind = 'translated'
+        elif track['language'] in (preferred_language, *fallback_languages):
+            kind = 'generated' if track['is_generated'] else 'manual'
+        else:
+            kind = 'fallback'
+        result = {
+            'transcript': segments,
+            'language': translate_to or track['language'],
+            'language_name': track['language_name'],
+            'type': kind,
+            'is_generated': track['is_generated'],
+        }
+
+    calls_saved = max(0, legacy_ladder_calls(tracks, preferred_language) - calls)
+    with _resolver_stats_lock:
+        resolver_stats['resolved'] += result is not None
+        resolver_stats['calls'] += calls
+        resolver_stats['calls_saved'] += calls_saved
+    if result is not None:
+        result['calls'] = calls
+        result['calls_saved'] = calls_saved
+    return result
@@ -0,0 +1,136 @@
+"""Éléments d'interface Streamlit partagés par les pages."""
+from typing import Optional
+
+import streamlit as st
+
+from ytseo import llm, metrics, pipeline, quota, seo, summarize, transcripts, youtube
+from ytseo.cache import get_api_cache
+
+# Export /metrics pour Prometheus si SEO_YOUTUBE_METRICS_PORT est défini
+metrics.start_from_environment()
+
+
+def sidebar_cache_stats():
+    """Affiche dans la barre latérale ce que les caches ont fait économiser."""
+    api_stats = get_api_cache().stats()
+    llm_stats = llm.get_llm_cache().stats()
+    st.caption(f"Cache API : {api_stats['hits']} hits / {api_stats['misses']} misses")
+    st.caption(
+        f"Cache LLM : {llm_stats['hits']} hits • {llm_stats['tokens_saved']:,} tokens "
+        f"et {llm_stats['seconds_saved']:.1f}s économisés"
+    )
+    st.caption(f"Transcriptions : {transcripts.resolver_stats['calls_saved']} appels évités")
+
+
+def sidebar_quota(youtube_api_key: str):
+    """Quota YouTube restant aujourd'hui pour la clé saisie."""
+    if not youtube_api_key:
+        return
+    planner = quota.get_planner()
+    remaining = planner.remaining(youtube_api_key)
+    st.progress(remaining / planner.daily_budget if planner.daily_budget else 0.0,
+                text=f"Quota YouTube : {remaining:,} / {planner.daily_budget:,} unités restantes")
+    if planner.conserve(youtube_api_key):
+        st.caption("Quota bas : recherches servies par le cache et appels regroupés en priorité.")
+
+
+def sidebar_metrics():
+    """Panneau repliable : durée des étapes, appels HTTP, tokens, et export Prometheus."""
+    with st.expander("⏱️ Mesures de performance"):
+        spans = metrics.registry.spans()
+        if spans:
+            st.dataframe(
+                [{'étape': name, 'appels': s['count'], 'moyenne (s)': round(s['avg_s'], 3),
+                  'p95 ≤ (s)': s['p95_s'], 'total (s)': round(s['total_s'], 1)}
+                 for name, s in sorted(spans.items(), key=lambda item: -item[1]['total_s'])],
+                hide_index=True,
+            )
+        counters = metrics.registry.counters()
+        http_calls = sum(v for (name, _), v in counters.items() if name == "http_requests_total")
+        http_bytes = sum(v for (name, _), v in counters.items() if name == "http_response_bytes_total")
+        tokens = {kind: sum(v for (name, labels), v in counters.items()
+                            if name == "llm_tokens_total" and ('kind', kind) in labels)
+                  for kind in ("prompt", "completion")}
+        st.caption(f"HTTP : {http_calls:,.0f} requêtes • {http_bytes / 1e6:.2f} Mo reçus")
+        st.caption(f"Tokens : {tokens['prompt']:,.0f} prompt • {tokens['completion']:,.0f} completion")
+        st.download_button("Export Prometheus", metrics.export_prometheus(), file_name="metrics.prom",
+                           mime="text/plain")
+
+
+def get_video_details(api_key: str, video_url: str) -> Optional[dict]:
+    """youtube.get_video_details, avec l'erreur affichée dans la page plutôt que relevée."""
+    try:
+        return youtube.get_video_details(api_key, video_url)
+    except Exception as e:
+        st.error(f"Error fetching video details: {e}")
+        return None
+
+
+def show_video_details(details: dict):
+    """Titre, description, chaîne, vues et date de publication de la vidéo d'origine."""
+    st.write("### Original Video Details")
+    st.write(f"**Title:** {details['title']}")
+    st.write(f"**Description:** {details['description']}")
+    st.write(f"**Channel:** {details['channel_title']}")
+    st.write(f"**Views:** {details['views']:,}")
+    st.write(f"**Published At:** {details['published_at']}")
+
+
+def show_transcript(video_id: str, language: str = 'fr', fallback_languages=('en',)) -> str:
+    """
+    Affiche la meilleure transcription (la langue demandée, puis les langues de repli) et la
+    renvoie ; '' si aucune ou en cas d'erreur, l'optimisation se faisant alors sans elle.
+    """
+    try:
+        transcript = pipeline.video_transcript_text(video_id, language, fallback_languages)
+    except Exception as e:
+        st.warning(f"Erreur lors de la récupération de la transcription: {str(e)}. L'optimisation SEO continuera avec le titre et la description uniquement.")
+        return ""
+    if not transcript['text']:
+        st.warning("Aucune transcription disponible pour cette vidéo.")
+        return ""
+    st.write(f"**Transcript ({transcript['language']}):** {transcript['text']}")
+    st.write(f"**Word Count:** {transcript['words']}")
+    return transcript['text']
+
+
+def show_optimized_metadata(openai_api_key: str, details: dict, transcript_text: str, regenerate: bool = False,
+                            stream: bool = False) -> Optional[dict]:
+    """
+    Génère et affiche titre, description et hashtags optimisés en une seule requête structurée,
+    au fil de l'eau avec `stream`. Un échec de génération est affiché ; retourne None dans ce cas.
+    """
+    # Extraits les plus représentatifs de toute la vidéo, dans un budget de tokens fixe
+    transcript_text = summarize.condense(transcript_text)
+    st.write("### Optimized Video Details")
+    try:
+        if stream:
+            # Le titre puis la description s'affichent au fil de la génération
+            structured = seo.stream_optimized_metadata(openai_api_key, details['title'], details['description'],
+                                                       transcript_text, regenerate)
+            st.write("**Optimized Title:**")
+            title_slot = st.empty()
+            with title_slot.container():
+                streamed_title = st.write_stream(structured.field('title'))
+            st.write("**Optimized Description:**")
+            description_slot = st.empty()
+            with description_slot.container():
+                streamed_description = st.write_stream(structured.field('description'))
+            metadata = seo.finalize_metadata(openai_api_key, structured.prompt, structured.result())
+            # Remplacer les champs corrigés après validation
+            if metadata['title'] != streamed_title:
+                title_slot.write(metadata['title'])
+            if metadata['description'] != streamed_description:
+                description_slot.write(metadata['description'])
+        else:
+            metadata = seo.generate_optimized_metadata(openai_api_key, details['title'], details['description'],
+                                                       transcript_text, regenerate)
+            st.write(f"**Optimized Title:** {metadata['title']}")
+            st.write(f"**Optimized Description:** {metadata['description']}")
+    except seo.GENERATION_ERRORS as e:
+        st.error(seo.generation_error_message(e))
+        return None
+    st.write(f"**Hashtags:** {' '.join(metadata['hashtags'])}")
+    if metadata['invalid_fields']:
+        st.warning(f"Champs hors contraintes après correction : {', '.join(metadata['invalid_fields'])}")
+    return metadata
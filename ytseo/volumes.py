@@ -0,0 +1,83 @@
+"""Volumes de recherche via l'API Keywords Everywhere, dédoublonnés et mis en cache."""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
+
+from ytseo import http_client
+from ytseo.cache import ApiCache, get_api_cache, make_key, normalize_query
+from ytseo.youtube import chunked
+
+KEYWORDS_EVERYWHERE_URL = os.environ.get("KEYWORDS_EVERYWHERE_URL", "https://api.keywordseverywhere.com/v1/get_keyword_data")
+# get_keyword_data accepte au plus 100 mots-clés par requête
+MAX_KEYWORDS_PER_REQUEST = 100
+VOLUME_TTL = 30 * 24 * 3600
+
+
+class VolumeService:
+    """
+    Interroge Keywords Everywhere uniquement pour les mots-clés absents du cache,
+    par lots de 100 envoyés en parallèle. Le cache est propre à chaque
+    combinaison (pays, devise, source de données).
+    """
+
+    def __init__(self, api_key: str, country: str = 'us', currency: str = 'usd', data_source: str = 'gkp',
+                 max_workers: int = 4, cache: ApiCache = None):
+        self.api_key = api_key
+        self.country = country
+        self.currency = currency
+        self.data_source = data_source
+        self.max_workers = max_workers
+        self.cache = cache or get_api_cache()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _cache_key(self, keyword: str) -> str:
+        return make_key("keywords_everywhere", {
+            'kw': keyword, 'country': self.country, 'currency': self.currency, 'dataSource': self.data_source,
+        })
+
+    def _fetch_chunk(self, keywords: List[str]) -> List[dict]:
+        data = {
+            'country': self.country,
+            'currency': self.currency,
+            'dataSource': self.data_source,
+            'kw[]': keywords
+        }
+        headers = {
+            'Accept': 'application/json',
+            'Authorization': f'Bearer {self.api_key}'
+        }
+        response = http_client.post(KEYWORDS_EVERYWHERE_URL, data=data, headers=headers)
+        response.raise_for_status()
+        return response.json().get('data', [])
+
+    def lookup(self, keywords: Iterable[str]) -> Dict[str, dict]:
+        """Retourne {mot-clé normalisé: données} ; lève requests.RequestException en cas d'échec."""
+        unique_keywords = list(dict.fromkeys(normalize_query(k) for k in keywords if k and k.strip()))
+        results = {}
+        missing = []
+        for keyword in unique_keywords:
+            cached = self.cache.get(self._cache_key(keyword))
+            if cached is None:
+                missing.append(keyword)
+            else:
+                results[keyword] = cached
+        with self._lock:
+            self.hits += len(unique_keywords) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="volumes") as pool:
+                for rows in pool.map(self._fetch_chunk, chunked(missing, MAX_KEYWORDS_PER_REQUEST)):
+                    for row in rows:
+                        keyword = normalize_query(row.get('keyword', ''))
+                        results[keyword] = row
+                        self.cache.set(self._cache_key(keyword), row, VOLUME_TTL)
+        return results
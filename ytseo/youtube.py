@@ -0,0 +1,263 @@
+"""Accès à l'API YouTube Data v3 : recherche et métadonnées de vidéos."""
+import os
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ytseo import http_client, metrics, quota
+from ytseo.cache import get_api_cache, make_key
+
+YOUTUBE_API_BASE = os.environ.get("YOUTUBE_API_BASE", "https://www.googleapis.com/youtube/v3")
+VIDEO_PARTS = "snippet,contentDetails,statistics"
+# videos.list accepte au plus 50 identifiants par requête
+MAX_IDS_PER_REQUEST = 50
+# search.list coûte 100 unités quel que soit maxResults : on en demande au moins 10 pour
+# qu'un nombre de résultats plus petit ou voisin soit ensuite servi par le cache
+MIN_SEARCH_RESULTS = 10
+MAX_SEARCH_RESULTS = 50
+# Au-delà, la recherche est paginée (nextPageToken) par pages de 50 ;
+# search.list ne renvoie de toute façon pas plus d'environ 500 résultats par requête
+SEARCH_PAGE_SIZE = 50
+MAX_PAGINATED_RESULTS = 500
+
+# Durées de vie du cache : les statistiques bougent vite, le reste très peu
+HOUR = 3600
+SEARCH_TTL = 6 * HOUR
+PART_TTLS = {
+    'snippet': 7 * 24 * HOUR,
+    'contentDetails': 7 * 24 * HOUR,
+    'statistics': 1 * HOUR,
+}
+DEFAULT_PART_TTL = 24 * HOUR
+# Liens courts et lecteurs : l'identifiant est dans le chemin et non dans le paramètre v=
+_PATH_VIDEO_ID = re.compile(r"(?:youtu\.be/|youtube\.com/(?:shorts|embed)/)([^/?&#]+)")
+
+
+def chunked(items: List, size: int) -> Iterator[List]:
+    """Découpe une liste en morceaux de taille `size` au plus."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def extract_video_id(video_url: str) -> str:
+    """
+    Extrait l'identifiant d'une URL https://www.youtube.com/watch?v=..., https://youtu.be/...,
+    .../shorts/... ou .../embed/... (un identifiant nu est renvoyé tel quel).
+    """
+    match = _PATH_VIDEO_ID.search(video_url)
+    if match:
+        return match.group(1)
+    return video_url.split("v=")[-1].split("&")[0]
+
+
+def _search_params(api_key: str, query: str, language: str, max_results: int) -> dict:
+    return {
+        "part": "snippet",
+        "q": query,
+        "type": "video",
+        "maxResults": max_results,
+        "relevanceLanguage": language,
+        "key": api_key,
+    }
+
+
+def _search_key(query: str, language: str) -> str:
+    # Une seule entrée par (requête, langue), quel que soit maxResults : la recherche la plus large
+    return make_key("search", _search_params("", query, language, None))
+
+
+def _cache_search(query: str, language: str, size: int, video_ids: List[str]):
+    get_api_cache().set(_search_key(query, language), {'ids': video_ids, 'size': size}, SEARCH_TTL)
+
+
+def cached_search(query: str, language: str, max_results: int) -> Optional[List[str]]:
+    """Résultats en cache pour la requête, y compris depuis une recherche plus large déjà faite."""
+    cached = get_api_cache().get(_search_key(query, language))
+    # Moins de résultats que demandé : plus étroite, sauf si la recherche avait tout renvoyé
+    if cached is None or (cached['size'] < max_results and len(cached['ids']) >= cached['size']):
+        return None
+    return cached['ids'][:max_results]
+
+
+@metrics.timed("search_videos")
+def search_videos(api_key: str, query: str, language: str, max_results: int = 5) -> List[str]:
+    """Retourne les identifiants des vidéos les plus pertinentes pour une requête."""
+    video_ids = cached_search(query, language, max_results)
+    if video_ids is not None:
+        return video_ids
+
+    fetch_size = min(max(max_results, MIN_SEARCH_RESULTS), MAX_SEARCH_RESULTS)
+    params = _search_params(api_key, query, language, fetch_size)
+    quota.get_planner().charge(api_key, "search")
+    response = http_client.get(f"{YOUTUBE_API_BASE}/search", params=params)
+    response.raise_for_status()
+    video_ids = [item['id']['videoId'] for item in response.json().get('items', [])]
+    _cache_search(query, language, fetch_size, video_ids)
+    return video_ids[:max_results]
+
+
+def _search_page_key(query: str, language: str, page_token: Optional[str]) -> str:
+    params = _search_params("", query, language, SEARCH_PAGE_SIZE)
+    params["pageToken"] = page_token
+    return make_key("search_page", params)
+
+
+def _search_page(api_key: str, query: str, language: str, page_token: Optional[str]) -> Tuple[List[str], Optional[str]]:
+    """Une page de résultats et le jeton de la suivante, en cache comme les recherches simples."""
+    cache = get_api_cache()
+    key = _search_page_key(query, language, page_token)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached['ids'], cached['next']
+
+    params = _search_params(api_key, query, language, SEARCH_PAGE_SIZE)
+    params["pageToken"] = page_token
+    quota.get_planner().charge(api_key, "search")
+    response = http_client.get(f"{YOUTUBE_API_BASE}/search", params=params)
+    response.raise_for_status()
+    data = response.json()
+    video_ids = [item['id']['videoId'] for item in data.get('items', [])]
+    next_token = data.get('nextPageToken')
+    cache.set(key, {'ids': video_ids, 'next': next_token}, SEARCH_TTL)
+    if page_token is None:
+        # La première page sert aussi les recherches simples (search_videos, cached_search)
+        _cache_search(query, language, SEARCH_PAGE_SIZE, video_ids)
+    return video_ids, next_token
+
+
+def iter_search_pages(api_key: str, query: str, language: str, max_results: int,
+                      max_units: Optional[int] = None) -> Iterator[List[str]]:
+    """
+    Identifiants des résultats page par page, dès que chaque page arrive : la page suivante
+    est demandée en arrière-plan pendant que l'appelant traite la courante (une page d'avance au plus).
+    S'arrête à `max_results`, à la dernière page, avant une page qui dépasserait `max_units`,
+    ou au dépassement du quota du jour si au moins une page a déjà été produite ; sans
+    aucune page possible, relève QuotaExceeded plutôt que de ne rien produire.
+    """
+    max_results = min(max_results, MAX_PAGINATED_RESULTS)
+    if max_results <= SEARCH_PAGE_SIZE:
+        # Une seule page : même chemin (et même cache) que search_videos
+        if max_units is not None and max_units < quota.COSTS['search'] and cached_search(query, language, max_results) is None:
+            # Recherche estimée gratuite au lancement, mais sortie du cache depuis
+            raise _over_budget(max_units)
+        yield search_videos(api_key, query, language, max_results)
+        return
+
+    cache = get_api_cache()
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-page")
+    spent = 0
+
+    def request(page_token: Optional[str]) -> Optional[Future]:
+        nonlocal spent
+        if cache.get(_search_page_key(query, language, page_token)) is None:
+            if max_units is not None and spent + quota.COSTS['search'] > max_units:
+                return None
+            spent += quota.COSTS['search']
+        return pool.submit(_search_page, api_key, query, language, page_token)
+
+    seen = set()
+    try:
+        future = request(None)
+        if future is None:
+            raise _over_budget(max_units)
+        while future is not None:
+            try:
+                video_ids, next_token = future.result()
+            except quota.QuotaExceeded:
+                if seen:
+                    return
+                raise
+            # Une vidéo peut remonter sur deux pages : elle n'est produite qu'une fois
+            page = [video_id for video_id in dict.fromkeys(video_ids) if video_id not in seen][:max_results - len(seen)]
+            seen.update(page)
+            future = None
+            if next_token and video_ids and len(seen) < max_results:
+                future = request(next_token)
+            if page:
+                yield page
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _over_budget(max_units: int) -> quota.QuotaExceeded:
+    return quota.QuotaExceeded(
+        f"YouTube API quota: search needs {quota.COSTS['search']} units, "
+        f"analysis budget is {max_units} units"
+    )
+
+
+def estimate_top_videos_cost(query: str, language: str, max_results: int) -> int:
+    """Unités au plus nécessaires pour la recherche suivie de videos.list (recherche gratuite si en cache)."""
+    max_results = min(max_results, MAX_PAGINATED_RESULTS)
+    if max_results <= SEARCH_PAGE_SIZE:
+        search_cost = 0 if cached_search(query, language, max_results) is not None else quota.COSTS['search']
+    else:
+        search_cost = -(-max_results // SEARCH_PAGE_SIZE) * quota.COSTS['search']
+    return search_cost + -(-max_results // MAX_IDS_PER_REQUEST) * quota.COSTS['videos']
+
+
+@metrics.timed("fetch_videos")
+def fetch_videos(api_key: str, video_ids: Iterable[str], parts: str = VIDEO_PARTS) -> Dict[str, dict]:
+    """
+    Récupère les métadonnées de plusieurs vidéos en un minimum d'appels.
+    Chaque partie (snippet, statistics...) est mise en cache séparément avec sa propre
+    durée de vie ; seules les parties manquantes sont redemandées, par lots de 50 (id=a,b,c).
+    Les vidéos introuvables sont simplement absentes du résultat.
+    """
+    cache = get_api_cache()
+    part_names = parts.split(",")
+    items = {}
+    missing_parts = {}
+    for video_id in dict.fromkeys(video_ids):
+        item = {'id': video_id}
+        for part in part_names:
+            cached = cache.get(make_key("videos", {'id': video_id, 'part': part}))
+            if cached is None:
+                missing_parts.setdefault(video_id, []).append(part)
+            else:
+                item[part] = cached
+        items[video_id] = item
+
+    # Regroupe les vidéos qui ont besoin des mêmes parties pour partager les requêtes ;
+    # quota bas : un seul groupe avec toutes les parties manquantes (moins d'appels, réponses plus lourdes)
+    planner = quota.get_planner()
+    groups = {}
+    if missing_parts and planner.conserve(api_key):
+        union = [part for part in part_names if any(part in missing for missing in missing_parts.values())]
+        groups[",".join(union)] = list(missing_parts)
+    else:
+        for video_id, missing in missing_parts.items():
+            groups.setdefault(",".join(missing), []).append(video_id)
+
+    for group_parts, group_ids in groups.items():
+        for chunk in chunked(group_ids, MAX_IDS_PER_REQUEST):
+            params = {"part": group_parts, "id": ",".join(chunk), "key": api_key}
+            planner.charge(api_key, "videos")
+            response = http_client.get(f"{YOUTUBE_API_BASE}/videos", params=params)
+            response.raise_for_status()
+            for fetched in response.json().get('items', []):
+                for part in group_parts.split(","):
+                    if part in fetched:
+                        items[fetched['id']][part] = fetched[part]
+                        cache.set(make_key("videos", {'id': fetched['id'], 'part': part}),
+                                  fetched[part], PART_TTLS.get(part, DEFAULT_PART_TTL))
+
+    return {video_id: item for video_id, item in items.items() if all(part in item for part in part_names)}
+
+
+@metrics.timed("get_video_details")
+def get_video_details(api_key: str, video_url: str) -> dict:
+    """Retourne les informations principales d'une vidéo à partir de son URL."""
+    video_id = extract_video_id(video_url)
+    video_data = fetch_videos(api_key, [video_id]).get(video_id)
+    if video_data is None:
+        raise LookupError(f"Video not found: {video_id}")
+
+    return {
+        'title': video_data['snippet']['title'],
+        'description': video_data['snippet']['description'],
+        'views': int(video_data['statistics'].get('viewCount', 0)),
+        'published_at': video_data['snippet']['publishedAt'],
+        'channel_title': video_data['snippet']['channelTitle'],
+        'video_id': video_id
+    }